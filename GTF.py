@@ -61,6 +61,8 @@ dict
         "T"           → transmission function (0–1)
         "Rc"          → cutoff rigidity [GV]
         "geomag_lat"  → geomagnetic latitude [deg]
+    With compact=True, a CompactGTF storing only (Rc, k, geomag_lat) and
+    evaluating T(R) on demand is returned instead (same keys).
 
 References
 -----------
@@ -73,34 +75,88 @@ References
 
 
 import numpy as np
-import ppigrf
 from datetime import datetime
 
+from field_tiers import tiered_igrf
+from igrf_cache import as_datetime64, cached_igrf, decimal_year, igrf_batch
+
 def to_decimal_year(dt):
     """Convert datetime to decimal year."""
-    year_start = datetime(dt.year, 1, 1)
-    year_end = datetime(dt.year + 1, 1, 1)
-    return dt.year + ((dt - year_start).total_seconds() /
-                      (year_end - year_start).total_seconds())
+    return decimal_year(dt)
 
-def geomagnetic_latitude(lat, lon, alt_km, date_decimal):
-    """
-    Approximate geomagnetic latitude using IGRF field direction.
-    """
-    Be, Bn, Bu = ppigrf.igrf(lon, lat, alt_km, date_decimal)
+def _dip_latitude(Be, Bn, Bu):
+    """Dip latitude [deg] from local ENU field components."""
     # inclination angle (positive down)
     inc = np.degrees(np.arctan2(Bu, np.sqrt(Be**2 + Bn**2)))
     # Approximate geomagnetic latitude (λm ≈ dip latitude)
-    lam_m = np.degrees(np.arctan(0.5 * np.tan(np.radians(inc))))
+    return np.degrees(np.arctan(0.5 * np.tan(np.radians(inc))))
+
+def geomagnetic_latitude(lat, lon, alt_km, date_decimal, tolerance=None):
+    """
+    Approximate geomagnetic latitude using IGRF field direction.
+
+    With `tolerance` [deg] the cheapest field_tiers tier whose dip-latitude
+    error bound meets it is used, and (lam_m, tier, bound [deg]) is returned.
+    """
+    if tolerance is not None:
+        Be, Bn, Bu, tier, bound = tiered_igrf(lon, lat, alt_km, date_decimal, tolerance, angular=True)
+        return _dip_latitude(Be, Bn, Bu), tier, bound
+    Be, Bn, Bu = cached_igrf(lon, lat, alt_km, date_decimal)
+    lam_m = _dip_latitude(Be, Bn, Bu)
     return lam_m
 
-def compute_cutoff_rigidity(lat, lon, alt_km, date):
+def geomagnetic_latitude_batch(lat, lon, alt_km, dates, epoch_resolution="D"):
+    """
+    Geomagnetic latitude for arrays of positions and times in one call.
+
+    Points are grouped by epoch (rounded to `epoch_resolution`, see
+    igrf_cache.igrf_batch) and each group is one broadcasted IGRF call.
+
+    Returns:
+        ndarray of geomagnetic latitude [deg] with the broadcast shape of
+        the inputs.
+    """
+    Be, Bn, Bu = igrf_batch(lat, lon, alt_km, dates, epoch_resolution)
+    return _dip_latitude(Be, Bn, Bu)
+
+def _backtrace_rigidity(lat, lon, alt_km, dates, shape, backtrace_options):
+    """Effective cutoff [GV] from cutoff_backtrace, reshaped to `shape`."""
+    from cutoff_backtrace import backtrace_cutoff
+    lat, lon, alt_km, dates = np.broadcast_arrays(lat, lon, alt_km, as_datetime64(dates))
+    Rc = backtrace_cutoff(lat, lon, alt_km, dates, **(backtrace_options or {}))["Rc"]
+    return Rc.reshape(shape)
+
+def compute_cutoff_rigidity(lat, lon, alt_km, date, method="stormer", backtrace_options=None):
     """
-    Compute vertical cutoff rigidity Rc [GV] using a simplified Störmer model.
+    Compute vertical cutoff rigidity Rc [GV].
+
+    method="stormer" uses the simplified Störmer model; method="backtrace"
+    computes the effective cutoff by numerical particle backtracing
+    (cutoff_backtrace.backtrace_cutoff, options passed via backtrace_options).
     """
     # if not isinstance(date, (float, int)):
     #     date = to_decimal_year(date)
     lam_m = geomagnetic_latitude(lat, lon, alt_km, date)
+    if method == "backtrace":
+        return _backtrace_rigidity(lat, lon, alt_km, date, np.shape(lam_m), backtrace_options), lam_m
+    if method != "stormer":
+        raise ValueError(f"Unknown cutoff method '{method}'.")
+    Rc = 14.9 * (np.cos(np.radians(lam_m)) ** 4)
+    return Rc, lam_m
+
+def compute_cutoff_rigidity_batch(lat, lon, alt_km, dates, epoch_resolution="D",
+                                  method="stormer", backtrace_options=None):
+    """
+    Vectorized `compute_cutoff_rigidity` over arrays of positions and times.
+
+    Returns:
+        (Rc, lam_m) arrays [GV], [deg] with the broadcast shape of the inputs.
+    """
+    lam_m = geomagnetic_latitude_batch(lat, lon, alt_km, dates, epoch_resolution)
+    if method == "backtrace":
+        return _backtrace_rigidity(lat, lon, alt_km, dates, lam_m.shape, backtrace_options), lam_m
+    if method != "stormer":
+        raise ValueError(f"Unknown cutoff method '{method}'.")
     Rc = 14.9 * (np.cos(np.radians(lam_m)) ** 4)
     return Rc, lam_m
 
@@ -110,10 +166,96 @@ def geomagnetic_transmission(R, Rc, k=1.0):
     """
     return 1.0 / (1.0 + np.exp(-k * (R - Rc)))
 
-def get_GTF(lat, lon, alt_km, date, R_vals=None):
+def default_rigidities():
+    """Default rigidity grid [GV] used when T(R) is evaluated."""
+    return np.linspace(0, 20, 200)  # Rigidity range [GV]
+
+class CompactGTF:
+    """
+    Parametric GTF result: stores only (Rc, k, geomag_lat) per point.
+
+    T(R) = geomagnetic_transmission(R, Rc, k) is evaluated lazily, so a
+    trajectory costs 3 numbers per point instead of a 200-point curve.
+    Indexing with the dense result keys ("R", "T", "Rc", "geomag_lat")
+    returns the same arrays get_GTF / get_GTF_batch would, with "T"
+    evaluated on `R_vals` (the default rigidity grid unless given). Integer,
+    slice or array keys select points and return a CompactGTF; an integer
+    key gives a single-location result.
+
+    Example:
+        gtf = get_GTF_batch(lats, lons, alts, date, compact=True)
+        T = gtf.T(np.array([1.0, 5.0, 10.0]))   # (N, 3)
+    """
+
+    def __init__(self, params, squeeze=False, R_vals=None):
+        self.params = params
+        self.squeeze = squeeze
+        self.R_vals = default_rigidities() if R_vals is None else np.asarray(R_vals, dtype=float)
+
+    @classmethod
+    def from_arrays(cls, Rc, geomag_lat, k=1.0, dtype=np.float64, squeeze=False, R_vals=None):
+        Rc = np.ravel(Rc)
+        params = np.empty(Rc.size, dtype=[("Rc", dtype), ("k", dtype), ("geomag_lat", dtype)])
+        params["Rc"] = Rc
+        params["k"] = k
+        params["geomag_lat"] = np.ravel(geomag_lat)
+        return cls(params, squeeze, R_vals)
+
+    @property
+    def Rc(self):
+        return self.params["Rc"]
+
+    @property
+    def k(self):
+        return self.params["k"]
+
+    @property
+    def geomag_lat(self):
+        return self.params["geomag_lat"]
+
+    def __len__(self):
+        return len(self.params)
+
+    def T(self, R_vals=None):
+        """Transmission T(R), shape (N, M) (or (M,) for a single-location result)."""
+        if R_vals is None:
+            R_vals = self.R_vals
+        R_vals = np.asarray(R_vals, dtype=self.params.dtype["Rc"])
+        T_vals = geomagnetic_transmission(R_vals[np.newaxis, :], self.Rc[:, np.newaxis],
+                                          self.k[:, np.newaxis])
+        return T_vals[0] if self.squeeze else T_vals
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key == "R":
+                return self.R_vals
+            if key == "T":
+                return self.T()
+            if key in ("Rc", "k", "geomag_lat"):
+                return self.params[key]
+            raise KeyError(key)
+        if isinstance(key, (int, np.integer)):
+            # Keep a length-1 structured array so T() still broadcasts.
+            return CompactGTF(self.params[[key]], squeeze=True, R_vals=self.R_vals)
+        return CompactGTF(self.params[key], R_vals=self.R_vals)
+
+    def to_dict(self, R_vals=None):
+        """Dense result in the get_GTF / get_GTF_batch layout."""
+        if R_vals is None:
+            R_vals = self.R_vals
+        return {"R": R_vals, "T": self.T(R_vals), "Rc": self.Rc, "geomag_lat": self.geomag_lat}
+
+def get_GTF(lat, lon, alt_km, date, R_vals=None, k=1.0, compact=False, method="stormer",
+            backtrace_options=None):
     """
     Compute the Geomagnetic Transmission Function (GTF) for given location/time.
 
+    With compact=True a CompactGTF is returned instead of the dense dict;
+    it supports the same keys and evaluates T(R) on demand (on R_vals).
+    method="backtrace" uses the numerically backtraced effective cutoff
+    instead of the Störmer estimate (see compute_cutoff_rigidity, which
+    also takes backtrace_options).
+
     Returns:
         dict with keys:
         - "R": rigidity array [GV]
@@ -121,12 +263,55 @@ def get_GTF(lat, lon, alt_km, date, R_vals=None):
         - "Rc": cutoff rigidity [GV]
         - "geomag_lat": geomagnetic latitude [deg]
     """
+    Rc, lam_m = compute_cutoff_rigidity(lat, lon, alt_km, date, method, backtrace_options)
+    if compact:
+        return CompactGTF.from_arrays(Rc, lam_m, k, squeeze=True, R_vals=R_vals)
+
     if R_vals is None:
-        R_vals = np.linspace(0, 20, 200)  # Rigidity range [GV]
+        R_vals = default_rigidities()
 
-    Rc, lam_m = compute_cutoff_rigidity(lat, lon, alt_km, date)
     #T_vals = geomagnetic_transmission(R_vals, Rc, k=1.2)
-    T_vals = geomagnetic_transmission(R_vals, Rc)
+    T_vals = geomagnetic_transmission(R_vals, Rc, k)
+
+    return {
+        "R": R_vals,
+        "T": T_vals,
+        "Rc": Rc,
+        "geomag_lat": lam_m
+    }
+
+def get_GTF_batch(lat, lon, alt_km, dates, R_vals=None, epoch_resolution="D",
+                  k=1.0, compact=False, dtype=np.float64, method="stormer",
+                  backtrace_options=None):
+    """
+    Compute the GTF for N positions/times in one broadcasted call.
+
+    lat, lon, alt_km and dates are broadcast against each other and
+    flattened to N points; dates may be datetimes, pandas Timestamps,
+    datetime64 values or decimal years (a single date applies to every point).
+
+    With compact=True a CompactGTF holding (Rc, k, geomag_lat) per point is
+    returned instead of the dense dict (T(R) on demand, on R_vals);
+    dtype=np.float32 halves it again. method and backtrace_options select
+    the cutoff model, as in compute_cutoff_rigidity.
+
+    Returns:
+        dict with keys:
+        - "R": rigidity array [GV], shape (M,)
+        - "T": transmission fraction [0–1], shape (N, M)
+        - "Rc": cutoff rigidity [GV], shape (N,)
+        - "geomag_lat": geomagnetic latitude [deg], shape (N,)
+    """
+    Rc, lam_m = compute_cutoff_rigidity_batch(lat, lon, alt_km, dates, epoch_resolution, method,
+                                              backtrace_options)
+    Rc, lam_m = Rc.ravel(), lam_m.ravel()
+    if compact:
+        return CompactGTF.from_arrays(Rc, lam_m, k, dtype, R_vals=R_vals)
+
+    if R_vals is None:
+        R_vals = default_rigidities()
+
+    T_vals = geomagnetic_transmission(np.asarray(R_vals)[np.newaxis, :], Rc[:, np.newaxis], k)
 
     return {
         "R": R_vals,
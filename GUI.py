@@ -6,7 +6,7 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import requests
 import threading
-from GTF import get_GTF
+from GTF import get_GTF, default_rigidities, geomagnetic_transmission
 from GUI_screenshot import take_window_screenshot
 from plot import open_figure_popup, plot_kp, plot_gtf
 from visual_design_elements import colors, fonts, images
@@ -14,6 +14,9 @@ from PIL import Image, ImageTk
 import os
 import pandas as pd
 import webbrowser
+import numpy as np
+from trajectory_engine import TrajectoryEngine, shutdown_executor
+from storm_cutoff import storm_cutoff_rigidity
 
 PRESETS = {
     "Custom": {"Cd": "", "A": "", "m": "", "rho": "", "v_rel": ""},
@@ -229,7 +232,12 @@ class GTFApp:
 
         # Compute button
         compute_btn = ttk.Button(frame, text="Compute GTF", command=self.compute_gtf, style="TButton")
-        compute_btn.grid(row=nrow, column=0, columnspan=2, pady=10)
+        compute_btn.grid(row=nrow, column=0, pady=10)
+        
+        # Cancel button for long trajectory runs
+        self.cancel_btn = ttk.Button(frame, text="Cancel", command=self.cancel_trajectory, style="TButton", state="disabled")
+        self.cancel_btn.grid(row=nrow, column=1, pady=10)
+        self.engine = None
 
 # =============================================================================
 #       Analysis Panel
@@ -347,18 +355,53 @@ class GTFApp:
             except Exception as e:
                 messagebox.showerror("Error", f"Could not compute GTF:\n{e}")
         else:
-            # Loop over calculation for whole trajectory.
-            epoch = datetime.datetime(2025, 1, 1, 0, 0, 0, tzinfo=datetime.timezone.utc)
-            latitudes = self.traj['Lat'] 
-            longitudes = self.traj['Lon'] 
-            altitudes = self.traj['Alt'] 
-            
-            results = []
-            for (lat, lon, alt) in zip(latitudes, longitudes, altitudes):
-                result = get_GTF(lat, lon, alt, epoch)
-                results.append(result)
+            # Spread the whole trajectory over a process pool; results stream
+            # back through root.after so the window stays responsive.
+            if self.engine is not None and self.engine.running:
+                return
+            epoch = datetime(2025, 1, 1, 0, 0, 0)
+            self.engine = TrajectoryEngine(self.root, self.traj, epoch,
+                                           on_chunk=self.show_partial_trajectory,
+                                           on_progress=self.update_trajectory_progress,
+                                           on_done=self.show_trajectory_result,
+                                           on_error=self.trajectory_failed)
+            self.loading_label.config(text=f"Computing GTF for {self.engine.total_rows} points...")
+            self.cancel_btn.config(state="normal")
+            self.engine.start()
             
-            open_figure_popup(root, results, Rc, True)
+    # ---------------------------------------------------
+    # Trajectory engine callbacks
+    # ---------------------------------------------------
+    def show_partial_trajectory(self, start, Rc, lam):
+        # Running statistics over the rows finished so far
+        done = self.engine.Rc[np.isfinite(self.engine.Rc)]
+        self.output_label.config(
+            text=f"Partial result ({done.size} points): mean Rc {done.mean():.2f} GV, "
+                 f"min {done.min():.2f} GV, max {done.max():.2f} GV")
+
+    def update_trajectory_progress(self, done, total):
+        self.loading_label.config(text=f"Computing GTF: {done}/{total} points ({100 * done / total:.0f}%)")
+
+    def show_trajectory_result(self, result):
+        self.cancel_btn.config(state="disabled")
+        self.loading_label.config(text="")
+        # Trajectory-averaged T(R): mean of the per-point curves built straight from Rc
+        R = default_rigidities()
+        T = np.nanmean(geomagnetic_transmission(R[:, np.newaxis], result["Rc"][np.newaxis, :]), axis=1)
+        Rc = np.nanmean(result["Rc"])
+        self.output_label.config(text=f"Trajectory mean cutoff rigidity: {Rc:.2f} GV")
+        plot_gtf(self.root, {"R": R, "T": T}, Rc, True)
+
+    def trajectory_failed(self, error):
+        self.cancel_btn.config(state="disabled")
+        self.loading_label.config(text="")
+        messagebox.showerror("Error", f"Could not compute GTF:\n{error}")
+
+    def cancel_trajectory(self):
+        if self.engine is not None:
+            self.engine.cancel()
+        self.cancel_btn.config(state="disabled")
+        self.loading_label.config(text="Trajectory calculation cancelled.")
             
     # ---------------------------------------------------
     # Threaded Kp fetch + environment analysis
@@ -371,15 +414,21 @@ class GTFApp:
             except Exception:
                 kp_val = 0.0
 
+        # The classifier already applies its own Kp thresholds, so it gets the
+        # quiet-time Rc; the storm-suppressed Rc is reported alongside.
         severity = self.analyze_environment(Rc, kp_val)
+        Rc_storm = storm_cutoff_rigidity(Rc, kp=kp_val).item()
 
         # Schedule safe GUI update from main thread
-        self.root.after(0, lambda: self.update_kp_display(kp_val, severity))
+        self.root.after(0, lambda: self.update_kp_display(kp_val, severity, Rc_storm))
 
-    def update_kp_display(self, kp_val, severity):
+    def update_kp_display(self, kp_val, severity, Rc_storm=None):
         """Update GUI with Kp and severity after thread completes."""
         color = "green" if severity == "Nominal" else ("orange" if severity == "Moderate" else "red")
-        self.kp_label.config(text=f"Kp Index (3-hr): {kp_val:.1f}")
+        kp_text = f"Kp Index (3-hr): {kp_val:.1f}"
+        if Rc_storm is not None:
+            kp_text += f"    Storm-time Rc: {Rc_storm:.2f} GV"
+        self.kp_label.config(text=kp_text)
         self.severity_label.config(text=f"Environment Level: {severity}", foreground=color)
         self.loading_label.config(text="")  # clear "fetching" text
         
@@ -393,7 +442,7 @@ class GTFApp:
         if preset == "Example Trajectory":
             print("Loading example trajectory...")
             file = os.path.join("Data", "example_trajectory.csv")
-            self.traj = pd.read_csv(file)
+            self.traj = pd.read_csv(file, skipinitialspace=True)
             self.singleloc = False
         else:
             self.singleloc = True
@@ -429,3 +478,4 @@ if __name__ == "__main__":
     root = tk.Tk()
     app = GTFApp(root)
     root.mainloop()
+    shutdown_executor()
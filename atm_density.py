@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tabulated thermospheric density for drag and lifetime calculations.
+
+Density is precomputed on an altitude × local solar time × latitude ×
+F10.7 × Ap grid, stored as memory-mapped .npy files (log10 density and
+temperature) under DEFAULT_TABLE_DIR and answered by vectorized
+multilinear interpolation in log density, so drag and decay loops pay one
+table lookup per point.
+
+Models
+------
+"jacchia"    built in: Jacchia-style exospheric temperature (solar flux,
+             diurnal bulge, Ap heating) with a Bates temperature profile and
+             diffusive equilibrium of N2, O2, O and He above 120 km
+"nrlmsise00" NRLMSISE-00 through the optional `nrlmsise00` package
+
+The F10.7 axis holds the effective flux F̄ + (1.3 / 3.24) (F - F̄) of the
+Jacchia temperature formula, so daily and 81-day values are both honoured
+with one axis. The solar declination is taken as zero (equinox).
+Altitudes below 120 km use the piecewise-exponential atmosphere; above the
+table they are evaluated live.
+
+Example
+-------
+    table = load_or_build()
+    rho = table.query(alt_km, local_time_h, lat, f107, f107a, ap)
+    rho = density_at(times, lat, lon, alt_km, space_weather=load_sw_daily())
+"""
+
+import os
+import threading
+
+import numpy as np
+
+from grid_interpolation import multilinear_interpolate
+from igrf_cache import as_datetime64
+
+DEFAULT_TABLE_DIR = os.path.join("Data", "density_table")
+
+# Table axes
+DEFAULT_ALTS = np.concatenate([np.arange(120.0, 600.0, 10.0), np.arange(600.0, 1000.0, 25.0),
+                               np.arange(1000.0, 1501.0, 50.0)])        # km
+DEFAULT_LOCAL_TIMES = np.arange(0.0, 24.1, 1.0)                       # h
+DEFAULT_LATS = np.arange(-90.0, 90.1, 10.0)                           # deg
+DEFAULT_F107 = np.arange(60.0, 301.0, 20.0)                           # sfu
+DEFAULT_AP = np.array([0.0, 4.0, 7.0, 15.0, 27.0, 48.0, 80.0, 132.0, 207.0, 300.0, 400.0])
+
+# Piecewise-exponential atmosphere (Vallado, Fundamentals of Astrodynamics,
+# Table 8-4): base altitude [km], base density [kg/m³], scale height [km]
+EXPONENTIAL_TABLE = np.array([
+    (0.0, 1.225, 7.249), (25.0, 3.899e-2, 6.349), (30.0, 1.774e-2, 6.682),
+    (40.0, 3.972e-3, 7.554), (50.0, 1.057e-3, 8.382), (60.0, 3.206e-4, 7.714),
+    (70.0, 8.770e-5, 6.549), (80.0, 1.905e-5, 5.799), (90.0, 3.396e-6, 5.382),
+    (100.0, 5.297e-7, 5.877), (110.0, 9.661e-8, 7.263), (120.0, 2.438e-8, 9.473),
+    (130.0, 8.484e-9, 12.636), (140.0, 3.845e-9, 16.149), (150.0, 2.070e-9, 22.523),
+    (180.0, 5.464e-10, 29.740), (200.0, 2.789e-10, 37.105), (250.0, 7.248e-11, 45.546),
+    (300.0, 2.418e-11, 53.628), (350.0, 9.518e-12, 53.298), (400.0, 3.725e-12, 58.515),
+    (450.0, 1.585e-12, 60.828), (500.0, 6.967e-13, 63.822), (600.0, 1.454e-13, 71.835),
+    (700.0, 3.614e-14, 88.667), (800.0, 1.170e-14, 124.64), (900.0, 5.245e-15, 181.05),
+    (1000.0, 3.019e-15, 268.00),
+])
+
+# Lower boundary (120 km) of the diffusive model
+Z_LOWER_KM = 120.0
+T_LOWER_K = 380.0
+R_EARTH_KM = 6356.766         # radius for geopotential height
+G_LOWER = 9.80665 * (R_EARTH_KM / (R_EARTH_KM + Z_LOWER_KM))**2   # m/s² at 120 km
+K_BOLTZMANN = 1.380649e-23
+AMU = 1.66053906660e-27
+# Species: molecular mass [amu], number density at 120 km [m^-3], thermal diffusion factor
+SPECIES = {
+    "N2": (28.0134, 3.8e17, 0.0),
+    "O2": (31.9988, 4.8e16, 0.0),
+    "O": (15.9994, 7.6e16, 0.0),
+    "He": (4.0026, 3.2e13, -0.38),
+}
+
+
+def exponential_density(alt_km):
+    """Piecewise-exponential density [kg/m³] at altitudes [km] (array-safe)."""
+    alt_km = np.asarray(alt_km, dtype=float)
+    base = EXPONENTIAL_TABLE[:, 0]
+    i = np.clip(np.searchsorted(base, alt_km, side="right") - 1, 0, len(base) - 1)
+    h0, rho0, H = EXPONENTIAL_TABLE[i].T
+    return rho0 * np.exp(-(alt_km - h0) / H)
+
+
+def effective_f107(f107, f107a=None):
+    """Single flux index F̄ + (1.3 / 3.24)(F - F̄) carrying both daily and mean F10.7."""
+    f107 = np.asarray(f107, dtype=float)
+    if f107a is None:
+        return f107
+    f107a = np.asarray(f107a, dtype=float)
+    return f107a + (1.3 / 3.24) * (f107 - f107a)
+
+
+def exospheric_temperature(local_time_h, lat, f107_eff, ap):
+    """Jacchia (1970/71) exospheric temperature [K] with zero solar declination."""
+    T_c = 379.0 + 3.24 * np.asarray(f107_eff, dtype=float)
+    lat_rad = np.radians(lat)
+    theta, eta = 0.5 * np.abs(lat_rad), 0.5 * np.abs(lat_rad)
+    H = np.radians(15.0 * (np.asarray(local_time_h, dtype=float) - 12.0))
+    tau = H + np.radians(-37.0) + np.radians(6.0) * np.sin(H + np.radians(43.0))
+    tau = (tau + np.pi) % (2 * np.pi) - np.pi
+    sin_m = np.sin(theta)**2.2
+    T_l = T_c * (1.0 + 0.3 * (sin_m + (np.cos(eta)**2.2 - sin_m) * np.cos(0.5 * tau)**3))
+    ap = np.asarray(ap, dtype=float)
+    return T_l + ap + 100.0 * (1.0 - np.exp(-0.08 * ap))
+
+
+def jacchia_density(alt_km, local_time_h, lat, f107, f107a=None, ap=15.0):
+    """
+    Density [kg/m³] and temperature [K] from the built-in Jacchia-style model.
+
+    All arguments broadcast; altitudes below 120 km use exponential_density
+    (temperature T_LOWER_K there).
+    """
+    T_inf = exospheric_temperature(local_time_h, lat, effective_f107(f107, f107a), ap)
+    z = np.maximum(np.asarray(alt_km, dtype=float), Z_LOWER_KM)
+    T_inf, z = np.broadcast_arrays(T_inf, z)
+
+    # Walker's shape parameter and the Bates profile in geopotential height
+    x = (T_inf - 800.0) / (750.0 + 1.722e-4 * (T_inf - 800.0)**2)
+    sigma = 0.0291 * np.exp(-0.5 * x**2) + 1.0 / (R_EARTH_KM + Z_LOWER_KM)     # 1/km
+    xi = (z - Z_LOWER_KM) * (R_EARTH_KM + Z_LOWER_KM) / (R_EARTH_KM + z)
+    T = T_inf - (T_inf - T_LOWER_K) * np.exp(-sigma * xi)
+
+    rho = np.zeros(T.shape)
+    for mass_amu, n_lower, alpha in SPECIES.values():
+        mass = mass_amu * AMU
+        gamma = mass * G_LOWER / (sigma * 1e-3 * K_BOLTZMANN * T_inf)
+        rho += mass * n_lower * (T_LOWER_K / T)**(1.0 + alpha + gamma) * np.exp(-sigma * gamma * xi)
+
+    below = np.asarray(alt_km) < Z_LOWER_KM
+    if np.any(below):
+        rho = np.where(below, exponential_density(alt_km), rho)
+        T = np.where(below, T_LOWER_K, T)
+    return rho, T
+
+
+def _nrlmsise_density(alt_km, local_time_h, lat, f107, ap):
+    """NRLMSISE-00 density and temperature at an equinox noon epoch (optional package)."""
+    from datetime import datetime
+    from nrlmsise00 import msise_flat
+
+    epoch = datetime(2000, 3, 20, 12)
+    lon = 15.0 * (np.asarray(local_time_h) - 12.0)
+    out = msise_flat(epoch, alt_km, lat, lon, f107, f107, ap)
+    return out[..., 5] * 1e3, out[..., 10]       # g/cm³ -> kg/m³, neutral temperature
+
+
+MODELS = {"jacchia": lambda alt, lt, lat, f107, ap: jacchia_density(alt, lt, lat, f107, None, ap),
+          "nrlmsise00": _nrlmsise_density}
+
+
+def local_solar_time(times, lon):
+    """Local mean solar time [h] from UTC times and longitude [deg]."""
+    t = as_datetime64(times)
+    hours = (t - t.astype("datetime64[D]")) / np.timedelta64(1, "h")
+    return (hours + np.asarray(lon, dtype=float) / 15.0) % 24.0
+
+
+class DensityTable:
+    """
+    log10 density and temperature on alt × local time × lat × F10.7 × Ap.
+
+    Attributes:
+        alts, local_times, lats, f107s, aps (ndarray): axes [km, h, deg, sfu, -]
+        log_rho (ndarray/memmap): log10 density [kg/m³]
+        temperature (ndarray/memmap): temperature [K]
+        model (str): name of the model the table was built from
+    """
+
+    def __init__(self, alts, local_times, lats, f107s, aps, log_rho, temperature, model="jacchia"):
+        self.alts = np.asarray(alts, dtype=float)
+        self.local_times = np.asarray(local_times, dtype=float)
+        self.lats = np.asarray(lats, dtype=float)
+        self.f107s = np.asarray(f107s, dtype=float)
+        self.aps = np.asarray(aps, dtype=float)
+        self.log_rho = log_rho
+        self.temperature = temperature
+        self.model = model
+        self._log_mean = None
+
+    @property
+    def axes(self):
+        return (self.alts, self.local_times, self.lats, self.f107s, self.aps)
+
+    @classmethod
+    def build(cls, directory=DEFAULT_TABLE_DIR, model="jacchia", alts=DEFAULT_ALTS,
+              local_times=DEFAULT_LOCAL_TIMES, lats=DEFAULT_LATS, f107s=DEFAULT_F107, aps=DEFAULT_AP):
+        """Evaluate `model` on the grid, one altitude slab at a time, into memmapped files."""
+        density_fn = MODELS[model]
+        axes = [np.asarray(a, dtype=float) for a in (alts, local_times, lats, f107s, aps)]
+        shape = tuple(a.size for a in axes)
+        os.makedirs(directory, exist_ok=True)
+        log_rho = np.lib.format.open_memmap(os.path.join(directory, "log_rho.npy"), mode="w+",
+                                            dtype=np.float32, shape=shape)
+        temperature = np.lib.format.open_memmap(os.path.join(directory, "temperature.npy"), mode="w+",
+                                                dtype=np.float32, shape=shape)
+        LT, LAT, F, AP = np.meshgrid(*axes[1:], indexing="ij")
+        for i, alt in enumerate(axes[0]):
+            rho, T = density_fn(alt, LT, LAT, F, AP)
+            log_rho[i], temperature[i] = np.log10(rho), T
+        log_rho.flush()
+        temperature.flush()
+        np.savez(os.path.join(directory, "axes.npz"), alts=axes[0], local_times=axes[1],
+                 lats=axes[2], f107s=axes[3], aps=axes[4], model=np.array(model))
+        return cls.load(directory)
+
+    @classmethod
+    def load(cls, directory=DEFAULT_TABLE_DIR):
+        """Open a built table; the value arrays stay memory-mapped."""
+        with np.load(os.path.join(directory, "axes.npz")) as data:
+            axes = [data[k] for k in ("alts", "local_times", "lats", "f107s", "aps")]
+            model = str(data["model"])
+        log_rho = np.load(os.path.join(directory, "log_rho.npy"), mmap_mode="r")
+        temperature = np.load(os.path.join(directory, "temperature.npy"), mmap_mode="r")
+        return cls(*axes, log_rho, temperature, model)
+
+    def query(self, alt_km, local_time_h, lat, f107, f107a=None, ap=15.0, return_temperature=False):
+        """
+        Density [kg/m³] (and temperature [K]) with the broadcast shape of the inputs.
+
+        Points below 120 km use exponential_density; points above the table
+        are evaluated live with the table's model.
+        """
+        alt_km, local_time_h, lat, f107, ap = np.broadcast_arrays(
+            np.asarray(alt_km, dtype=float), np.asarray(local_time_h, dtype=float) % 24.0,
+            np.asarray(lat, dtype=float), effective_f107(f107, f107a), np.asarray(ap, dtype=float))
+        shape = alt_km.shape
+        points = tuple(p.ravel() for p in (alt_km, local_time_h, lat, f107, ap))
+        alt_km = points[0]
+        # Writable float64 arrays (the table is float32; a scalar query would give a numpy scalar)
+        rho = np.array(10.0 ** multilinear_interpolate(self.axes, self.log_rho, points),
+                       dtype=float, ndmin=1)
+        T = (np.array(multilinear_interpolate(self.axes, self.temperature, points),
+                      dtype=float, ndmin=1)
+             if return_temperature else None)
+
+        above = alt_km > self.alts[-1]
+        if np.any(above):
+            live_rho, live_T = MODELS[self.model](*(p[above] for p in points))
+            rho[above] = live_rho
+            if return_temperature:
+                T[above] = live_T
+        below = alt_km < self.alts[0]
+        if np.any(below):
+            rho[below] = exponential_density(alt_km[below])
+            if return_temperature:
+                T[below] = T_LOWER_K
+        rho = rho.reshape(shape)
+        return (rho, T.reshape(shape)) if return_temperature else rho
+
+    def orbit_average(self, alt_km, f107, f107a=None, ap=15.0):
+        """Density [kg/m³] averaged over local time and latitude (area weighted)."""
+        if self._log_mean is None:
+            lat_weights = np.cos(np.radians(self.lats))
+            lt_weights = np.ones(self.local_times.size)
+            lt_weights[[0, -1]] = 0.5            # 0 h and 24 h are the same time
+            mean = np.einsum("atlfp,t,l->afp", 10.0 ** np.asarray(self.log_rho, dtype=float),
+                             lt_weights / lt_weights.sum(), lat_weights / lat_weights.sum())
+            self._log_mean = np.log10(mean)
+        alt_km, f107, ap = np.broadcast_arrays(np.asarray(alt_km, dtype=float),
+                                               effective_f107(f107, f107a), np.asarray(ap, dtype=float))
+        rho = 10.0 ** multilinear_interpolate((self.alts, self.f107s, self.aps), self._log_mean,
+                                              (alt_km, f107, ap))
+        return np.where(alt_km < self.alts[0], exponential_density(alt_km), rho)
+
+
+_TABLES = {}
+_TABLES_LOCK = threading.Lock()
+
+
+def load_or_build(directory=DEFAULT_TABLE_DIR, **build_kwargs):
+    """Open the table in `directory` (building it on first use); shared per process."""
+    with _TABLES_LOCK:
+        if directory not in _TABLES:
+            if os.path.exists(os.path.join(directory, "axes.npz")):
+                _TABLES[directory] = DensityTable.load(directory)
+            else:
+                _TABLES[directory] = DensityTable.build(directory, **build_kwargs)
+        return _TABLES[directory]
+
+
+def density_at(times, lat, lon, alt_km, space_weather=None, table=None):
+    """
+    Density [kg/m³] along a trajectory: UTC times, geodetic lat/lon [deg], alt [km].
+
+    space_weather is a space_weather_cache.SpaceWeatherTable (constant
+    reference indices when None).
+    """
+    from space_weather_cache import SpaceWeatherTable
+
+    table = table or load_or_build()
+    space_weather = space_weather or SpaceWeatherTable.constant()
+    f107, f107a, ap = space_weather.lookup(as_datetime64(times))
+    return table.query(alt_km, local_solar_time(times, lon), lat, f107, f107a, ap)
+
+
+if __name__ == "__main__":
+    import time
+
+    t0 = time.perf_counter()
+    table = load_or_build()
+    print(f"Table {table.log_rho.shape} ready in {time.perf_counter() - t0:.2f} s")
+
+    n = 1_000_000
+    rng = np.random.default_rng(0)
+    args = (rng.uniform(150, 1500, n), rng.uniform(0, 24, n), rng.uniform(-90, 90, n),
+            rng.uniform(70, 250, n), rng.uniform(70, 250, n), rng.uniform(0, 100, n))
+    t0 = time.perf_counter()
+    rho = table.query(*args)
+    elapsed = time.perf_counter() - t0
+    exact, _ = jacchia_density(args[0], args[1], args[2], args[3], args[4], args[5])
+    print(f"{n} table queries in {elapsed:.2f} s; max |log10 error| "
+          f"{np.max(np.abs(np.log10(rho / exact))):.3f}")
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Registry of interchangeable atmosphere models with one vectorized signature.
+
+Every model is called as
+
+    density, temperature = model(times, lat, lon, alt_km)
+
+with UTC times, geodetic latitude/longitude [deg] and altitude [km]
+(broadcast together), returning kg/m³ and K. The F10.7, 81-day mean F10.7
+and Ap inputs come from the model's space_weather_cache.SpaceWeatherTable
+and are memoized per timestamp, so comparing models over a year of orbit
+data looks each index up once.
+
+Registered models
+-----------------
+"table"        atm_density.DensityTable (memory-mapped, interpolated)
+"jacchia"      the Jacchia-style model of atm_density, evaluated live
+"exponential"  piecewise-exponential atmosphere (no space weather, no temperature)
+"nrlmsise00"   NRLMSISE-00 through the optional `nrlmsise00` package
+
+New backends subclass AtmosphereModel, implement `evaluate` and register
+with @register_model("name"). evaluate_batched splits long inputs into
+batches and runs them on a thread or process pool.
+
+Example
+-------
+    sw = load_sw_daily()
+    for name in available_models():
+        rho, T = evaluate_batched(get_model(name, sw), times, lat, lon, alt_km)
+"""
+
+import importlib.util
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+import atm_density
+from igrf_cache import as_datetime64
+from space_weather_cache import SpaceWeatherTable
+
+DEFAULT_BATCH_SIZE = 100_000
+
+MODELS = {}
+
+
+def register_model(name):
+    """Class decorator adding an AtmosphereModel subclass to MODELS under `name`."""
+    def decorator(cls):
+        cls.name = name
+        MODELS[name] = cls
+        return cls
+    return decorator
+
+
+def get_model(name, space_weather=None, **kwargs):
+    """Instance of the registered model `name`."""
+    try:
+        cls = MODELS[name]
+    except KeyError:
+        raise KeyError(f"Unknown atmosphere model {name!r}; registered: {sorted(MODELS)}") from None
+    return cls(space_weather, **kwargs)
+
+
+def available_models():
+    """Names of the registered models whose dependencies are installed."""
+    return [name for name, cls in MODELS.items() if cls.available()]
+
+
+class AtmosphereModel:
+    """
+    Base class: memoized space-weather inputs plus the common call signature.
+
+    Subclasses implement evaluate(times, lat, lon, alt_km, f107, f107a, ap)
+    on flat, equally long arrays and return (density, temperature).
+    """
+
+    name = None
+    requires = None           # optional module the backend needs
+
+    def __init__(self, space_weather=None):
+        self.space_weather = space_weather or SpaceWeatherTable.constant()
+        # Memoized inputs: sorted timestamps [ns] and their (F10.7, F10.7a, Ap) rows
+        self._keys = np.empty(0, dtype=np.int64)
+        self._values = np.empty((0, 3))
+
+    @classmethod
+    def available(cls):
+        return cls.requires is None or importlib.util.find_spec(cls.requires) is not None
+
+    def indices(self, times):
+        """(F10.7, F10.7a, Ap) for datetime64 `times`, each timestamp looked up once per model."""
+        times = as_datetime64(times)
+        keys = times.astype("datetime64[ns]").astype(np.int64).ravel()
+        missing = np.setdiff1d(keys, self._keys)
+        if missing.size:
+            values = np.column_stack(self.space_weather.lookup(missing.astype("datetime64[ns]")))
+            self._keys = np.concatenate([self._keys, missing])
+            self._values = np.concatenate([self._values, values])
+            order = np.argsort(self._keys, kind="stable")
+            self._keys, self._values = self._keys[order], self._values[order]
+        rows = self._values[np.searchsorted(self._keys, keys)]
+        return tuple(rows[:, i].reshape(times.shape) for i in range(3))
+
+    def evaluate(self, times, lat, lon, alt_km, f107, f107a, ap):
+        raise NotImplementedError
+
+    def __call__(self, times, lat, lon, alt_km):
+        times, lat, lon, alt_km = np.broadcast_arrays(
+            as_datetime64(times), np.asarray(lat, dtype=float),
+            np.asarray(lon, dtype=float), np.asarray(alt_km, dtype=float))
+        shape = times.shape
+        times, lat, lon, alt_km = (x.ravel() for x in (times, lat, lon, alt_km))
+        rho, T = self.evaluate(times, lat, lon, alt_km, *self.indices(times))
+        return np.reshape(rho, shape), np.reshape(T, shape)
+
+
+# ---------------------------------------------------
+# Backends
+# ---------------------------------------------------
+@register_model("table")
+class TableModel(AtmosphereModel):
+    """atm_density.DensityTable, loaded (or built) from `directory` on first use."""
+
+    def __init__(self, space_weather=None, directory=atm_density.DEFAULT_TABLE_DIR):
+        super().__init__(space_weather)
+        self.directory = directory
+
+    def evaluate(self, times, lat, lon, alt_km, f107, f107a, ap):
+        table = atm_density.load_or_build(self.directory)
+        return table.query(alt_km, atm_density.local_solar_time(times, lon), lat, f107, f107a, ap,
+                           return_temperature=True)
+
+
+@register_model("jacchia")
+class JacchiaModel(AtmosphereModel):
+    """Live evaluation of atm_density.jacchia_density."""
+
+    def evaluate(self, times, lat, lon, alt_km, f107, f107a, ap):
+        return atm_density.jacchia_density(alt_km, atm_density.local_solar_time(times, lon),
+                                           lat, f107, f107a, ap)
+
+
+@register_model("exponential")
+class ExponentialModel(AtmosphereModel):
+    """Piecewise-exponential density; temperature is not modelled (NaN)."""
+
+    def evaluate(self, times, lat, lon, alt_km, f107, f107a, ap):
+        return atm_density.exponential_density(alt_km), np.full(alt_km.shape, np.nan)
+
+
+@register_model("nrlmsise00")
+class NRLMSISEModel(AtmosphereModel):
+    """NRLMSISE-00 (pip install nrlmsise00) with daily Ap."""
+
+    requires = "nrlmsise00"
+
+    def evaluate(self, times, lat, lon, alt_km, f107, f107a, ap):
+        from nrlmsise00 import msise_flat
+
+        dates = times.astype("datetime64[us]").astype(object)
+        out = msise_flat(dates, alt_km, lat, lon, f107a, f107, ap)
+        return out[..., 5] * 1e3, out[..., 10]       # g/cm³ -> kg/m³, neutral temperature
+
+
+# ---------------------------------------------------
+# Batched evaluation
+# ---------------------------------------------------
+_WORKER_MODELS = {}
+
+
+def _evaluate_batch(name, kwargs, times, lat, lon, alt_km, f107, f107a, ap):
+    """Process-pool entry point: one model instance per worker and configuration."""
+    key = (name, tuple(sorted(kwargs.items())))
+    if key not in _WORKER_MODELS:
+        _WORKER_MODELS[key] = get_model(name, **kwargs)
+    return _WORKER_MODELS[key].evaluate(times, lat, lon, alt_km, f107, f107a, ap)
+
+
+def evaluate_batched(model, times, lat, lon, alt_km, batch_size=DEFAULT_BATCH_SIZE,
+                     executor="thread", max_workers=None, **model_kwargs):
+    """
+    Evaluate `model` over long inputs in batches on a pool.
+
+    Parameters:
+        model (AtmosphereModel or str): model instance, or registered name
+            (instantiated with `model_kwargs`)
+        times, lat, lon, alt_km (array_like): broadcast together
+        batch_size (int): points per task
+        executor: "thread", "process" (spawned workers, each with its own
+            model instance) or a concurrent.futures.Executor
+        max_workers (int, optional): pool size, defaults to os.cpu_count()
+
+    Returns:
+        (density, temperature) with the broadcast shape of the inputs.
+    """
+    if isinstance(model, str):
+        model = get_model(model, **model_kwargs)
+    times, lat, lon, alt_km = np.broadcast_arrays(
+        as_datetime64(times), np.asarray(lat, dtype=float),
+        np.asarray(lon, dtype=float), np.asarray(alt_km, dtype=float))
+    shape = times.shape
+    times, lat, lon, alt_km = (x.ravel() for x in (times, lat, lon, alt_km))
+    f107, f107a, ap = model.indices(times)       # resolved once, in this process
+
+    columns = (times, lat, lon, alt_km, f107, f107a, ap)
+    batches = [tuple(c[start:start + batch_size] for c in columns)
+               for start in range(0, times.size, batch_size)]
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if executor == "process":
+        kwargs = {k: v for k, v in vars(model).items()
+                  if not k.startswith("_") and k != "space_weather"}
+        pool = ProcessPoolExecutor(max_workers=max_workers,
+                                   mp_context=multiprocessing.get_context("spawn"))
+        submit = lambda batch: pool.submit(_evaluate_batch, model.name, kwargs, *batch)
+    else:
+        pool = ThreadPoolExecutor(max_workers=max_workers) if executor == "thread" else executor
+        submit = lambda batch: pool.submit(model.evaluate, *batch)
+
+    try:
+        results = [f.result() for f in [submit(batch) for batch in batches]]
+    finally:
+        if pool is not executor:
+            pool.shutdown()
+
+    rho = np.concatenate([r[0] for r in results]) if results else np.empty(0)
+    T = np.concatenate([r[1] for r in results]) if results else np.empty(0)
+    return rho.reshape(shape), T.reshape(shape)
+
+
+if __name__ == "__main__":
+    import time
+
+    # One year of a 400 km, 51.6° orbit sampled every minute
+    n = 365 * 1440
+    times = np.datetime64("2024-01-01", "ns") + np.arange(n) * np.timedelta64(60, "s")
+    phase = 2 * np.pi * np.arange(n) / 92.6
+    lat = np.degrees(np.arcsin(np.sin(np.radians(51.6)) * np.sin(phase)))
+    lon = (np.degrees(phase) - 360.0 * np.arange(n) / 1436.0) % 360.0 - 180.0
+    alt = np.full(n, 400.0)
+
+    sw = SpaceWeatherTable.constant(f107=180.0, f107a=160.0, ap=12.0)
+    for name in available_models():
+        t0 = time.perf_counter()
+        rho, T = evaluate_batched(get_model(name, sw), times, lat, lon, alt)
+        print(f"{name:12s} {n} points in {time.perf_counter() - t0:.2f} s, "
+              f"mean rho {np.mean(rho):.3e} kg/m³")
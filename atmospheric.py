@@ -20,17 +20,13 @@ Created on Sat Nov 22 20:22:27 2025
 # File paths and outputs are saved under /mnt/data so you can download them.
 from datetime import datetime, timezone
 import numpy as np
-import matplotlib.pyplot as plt
 import os
 from math import exp
-import folium
-from IPython.display import display, HTML, Image
 
 # Uploaded placeholder image path (provided by developer instructions)
 uploaded_image_path = "/mnt/data/0aebadae-a8cb-41e6-9fc6-9417be24578f.png"
 
-# Sample input: current datetime UTC and Boulder, CO coordinates
-sample_dt = datetime.now(timezone.utc)
+# Sample input: Boulder, CO coordinates
 boulder_lat = 40.0150
 boulder_lon = -105.2705
 boulder_alt_km = 1.6  # approx altitude in km
@@ -94,53 +90,60 @@ def compute_transmission(lat, lon, alt_km, dt_utc, wavelengths_um, airmass=1.0,
     T = np.exp(-tau)
     return wavelengths_um, T, tau
 
-# Compute for the sample input (Boulder now)
-wl, T_boulder, tau_boulder = compute_transmission(boulder_lat, boulder_lon, boulder_alt_km, sample_dt, wavelengths_um)
-
-# Plot transmission vs wavelength
-plt.figure(figsize=(10,4))
-plt.plot(wl, T_boulder, linewidth=1.6)
-plt.fill_between(wl, T_boulder, alpha=0.15)
-plt.xlabel("Wavelength (µm)")
-plt.ylabel("Transmission (0-1)")
-plt.title(f"Sample Transmission vs Wavelength — Boulder, CO (UTC {sample_dt.strftime('%Y-%m-%d %H:%M')})")
-plt.ylim(-0.05, 1.05)
-plt.grid(alpha=0.3)
-out_plot_path = "/mnt/data/transmission_boulder.png"
-plt.tight_layout()
-plt.savefig(out_plot_path, dpi=150)
-plt.show()
-
-# Make a quick summary heat indicator (mean transmission in visible and near-IR bands)
-vis_mask = (wl >= 0.4) & (wl <= 0.7)
-nir_mask = (wl >= 0.7) & (wl <= 2.5)
-vis_mean = float(np.mean(T_boulder[vis_mask]))
-nir_mean = float(np.mean(T_boulder[nir_mask]))
-
-summary_text = f"Mean visible transmission (0.4–0.7 µm): {vis_mean:.2f}\nMean NIR transmission (0.7–2.5 µm): {nir_mean:.2f}"
-print(summary_text)
-
-# Create a folium world map with a marker at Boulder and a popup showing mean transmission
-map_center = [boulder_lat, boulder_lon]
-m = folium.Map(location=map_center, zoom_start=4, tiles="Stamen Terrain")
-popup_html = f"<b>Boulder, CO (sample)</b><br>{sample_dt.strftime('%Y-%m-%d %H:%M UTC')}<br>" \
-             f"Mean VIS T: {vis_mean:.2f}<br>Mean NIR T: {nir_mean:.2f}"
-
-folium.Marker(location=map_center, popup=popup_html, tooltip="Boulder, CO").add_to(m)
-
-# Save map to file
-map_out = "/mnt/data/boulder_map.html"
-m.save(map_out)
-
-# Display the uploaded placeholder image (file provided by developer) and links to outputs
-display(Image(uploaded_image_path, width=420))
-display(HTML(f"<p><b>Generated outputs saved to:</b></p>"
-             f"<ul>"
-             f"<li><a href='file://{out_plot_path}'>Transmission plot (PNG)</a></li>"
-             f"<li><a href='file://{map_out}'>Boulder map (HTML)</a></li>"
-             f"</ul>"))
-
-# Also print the local file paths for convenience
-out_files = {"plot_png": out_plot_path, "map_html": map_out, "placeholder_image": uploaded_image_path}
-out_files
-
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+    import folium
+    from IPython.display import display, HTML, Image
+
+    # Sample input: current datetime UTC
+    sample_dt = datetime.now(timezone.utc)
+
+    # Compute for the sample input (Boulder now)
+    wl, T_boulder, tau_boulder = compute_transmission(boulder_lat, boulder_lon, boulder_alt_km, sample_dt, wavelengths_um)
+
+    # Plot transmission vs wavelength
+    plt.figure(figsize=(10,4))
+    plt.plot(wl, T_boulder, linewidth=1.6)
+    plt.fill_between(wl, T_boulder, alpha=0.15)
+    plt.xlabel("Wavelength (µm)")
+    plt.ylabel("Transmission (0-1)")
+    plt.title(f"Sample Transmission vs Wavelength — Boulder, CO (UTC {sample_dt.strftime('%Y-%m-%d %H:%M')})")
+    plt.ylim(-0.05, 1.05)
+    plt.grid(alpha=0.3)
+    out_plot_path = "/mnt/data/transmission_boulder.png"
+    plt.tight_layout()
+    plt.savefig(out_plot_path, dpi=150)
+    plt.show()
+
+    # Make a quick summary heat indicator (mean transmission in visible and near-IR bands)
+    vis_mask = (wl >= 0.4) & (wl <= 0.7)
+    nir_mask = (wl >= 0.7) & (wl <= 2.5)
+    vis_mean = float(np.mean(T_boulder[vis_mask]))
+    nir_mean = float(np.mean(T_boulder[nir_mask]))
+
+    summary_text = f"Mean visible transmission (0.4–0.7 µm): {vis_mean:.2f}\nMean NIR transmission (0.7–2.5 µm): {nir_mean:.2f}"
+    print(summary_text)
+
+    # Create a folium world map with a marker at Boulder and a popup showing mean transmission
+    map_center = [boulder_lat, boulder_lon]
+    m = folium.Map(location=map_center, zoom_start=4, tiles="Stamen Terrain")
+    popup_html = f"<b>Boulder, CO (sample)</b><br>{sample_dt.strftime('%Y-%m-%d %H:%M UTC')}<br>" \
+                 f"Mean VIS T: {vis_mean:.2f}<br>Mean NIR T: {nir_mean:.2f}"
+
+    folium.Marker(location=map_center, popup=popup_html, tooltip="Boulder, CO").add_to(m)
+
+    # Save map to file
+    map_out = "/mnt/data/boulder_map.html"
+    m.save(map_out)
+
+    # Display the uploaded placeholder image (file provided by developer) and links to outputs
+    display(Image(uploaded_image_path, width=420))
+    display(HTML(f"<p><b>Generated outputs saved to:</b></p>"
+                 f"<ul>"
+                 f"<li><a href='file://{out_plot_path}'>Transmission plot (PNG)</a></li>"
+                 f"<li><a href='file://{map_out}'>Boulder map (HTML)</a></li>"
+                 f"</ul>"))
+
+    # Also print the local file paths for convenience
+    out_files = {"plot_png": out_plot_path, "map_html": map_out, "placeholder_image": uploaded_image_path}
+    out_files
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite for the GTF, magnetic field, drag and CDAW hot paths.
+
+Every benchmark runs on fixed synthetic inputs (seeded RNG, or the CSV files
+shipped in Data/) at several input sizes, with no network access. Results
+are written as JSON so two runs can be compared between commits.
+
+Usage
+-----
+    python benchmark.py                         # all benchmarks -> benchmark_results.json
+    python benchmark.py -k GTF --repeat 10      # only names containing "GTF"
+    python benchmark.py --quick -o new.json     # smallest size of each benchmark
+    python benchmark.py --compare old.json new.json
+
+Output format
+-------------
+    {"meta": {"commit": ..., "python": ..., "numpy": ..., "platform": ..., "timestamp": ...},
+     "results": [{"name": ..., "size": ..., "repeat": ..., "min_s": ..., "median_s": ...,
+                  "mean_s": ..., "per_item_us": ...}, ...],
+     "skipped": {"name": "reason", ...}}
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+SEED = 12345
+DEFAULT_OUTPUT = "benchmark_results.json"
+DEFAULT_REPEAT = 5
+DATE = datetime(2025, 11, 9)
+
+# name -> (sizes, setup); setup(size, rng) returns the zero-argument callable to time.
+BENCHMARKS = {}
+
+
+def benchmark(name, sizes):
+    """Register a benchmark setup function under `name` for the given input sizes."""
+    def register(setup):
+        BENCHMARKS[name] = (tuple(sizes), setup)
+        return setup
+    return register
+
+
+def _positions(size, rng):
+    return (rng.uniform(-85, 85, size), rng.uniform(-180, 180, size), rng.uniform(0, 2000, size))
+
+
+def _clear_igrf_cache():
+    from igrf_cache import IGRF_CACHE
+    IGRF_CACHE.clear()
+
+
+# ---------------------------------------------------
+# GTF
+# ---------------------------------------------------
+@benchmark("GTF.get_GTF", sizes=(10, 100, 1000))
+def bench_get_GTF(size, rng):
+    from GTF import get_GTF
+    lat, lon, alt = _positions(size, rng)
+
+    def run():
+        _clear_igrf_cache()
+        for i in range(size):
+            get_GTF(lat[i], lon[i], alt[i], DATE)
+    return run
+
+
+@benchmark("GTF.get_GTF_batch", sizes=(100, 10_000, 100_000))
+def bench_get_GTF_batch(size, rng):
+    from GTF import get_GTF_batch
+    lat, lon, alt = _positions(size, rng)
+    return lambda: get_GTF_batch(lat, lon, alt, DATE)
+
+
+@benchmark("GTF.compute_cutoff_rigidity", sizes=(10, 100, 1000))
+def bench_compute_cutoff_rigidity(size, rng):
+    from GTF import compute_cutoff_rigidity
+    lat, lon, alt = _positions(size, rng)
+
+    def run():
+        _clear_igrf_cache()
+        for i in range(size):
+            compute_cutoff_rigidity(lat[i], lon[i], alt[i], DATE)
+    return run
+
+
+@benchmark("GTF.compute_cutoff_rigidity_batch", sizes=(100, 10_000, 100_000))
+def bench_compute_cutoff_rigidity_batch(size, rng):
+    from GTF import compute_cutoff_rigidity_batch
+    lat, lon, alt = _positions(size, rng)
+    return lambda: compute_cutoff_rigidity_batch(lat, lon, alt, DATE)
+
+
+# ---------------------------------------------------
+# Magnetic field
+# ---------------------------------------------------
+@benchmark("magnetic_field.get_B_field", sizes=(10, 100, 1000))
+def bench_get_B_field(size, rng):
+    from magnetic_field import get_B_field
+    lat, lon, alt = _positions(size, rng)
+
+    def run():
+        _clear_igrf_cache()
+        for i in range(size):
+            get_B_field(lat[i], lon[i], alt[i], DATE)
+    return run
+
+
+@benchmark("magnetic_field.get_B_field_batch", sizes=(100, 10_000, 100_000))
+def bench_get_B_field_batch(size, rng):
+    from magnetic_field import get_B_field_batch
+    lat, lon, alt = _positions(size, rng)
+    return lambda: get_B_field_batch(lat, lon, alt, DATE)
+
+
+@benchmark("igrf_native.igrf", sizes=(1, 1000, 100_000))
+def bench_igrf_native(size, rng):
+    from igrf_native import igrf
+    lat, lon, alt = _positions(size, rng)
+    return lambda: igrf(lon, lat, alt, DATE)
+
+
+@benchmark("field_tiers.tiered_igrf", sizes=(1, 1000, 100_000))
+def bench_tiered_igrf(size, rng):
+    from field_tiers import tiered_igrf
+    lat, lon, alt = _positions(size, rng)
+    return lambda: tiered_igrf(lon, lat, alt, DATE, tolerance=1000.0)
+
+
+@benchmark("coordinates.ecef_to_geodetic", sizes=(1000, 100_000, 1_000_000))
+def bench_ecef_to_geodetic(size, rng):
+    from coordinates import ecef_to_geodetic, geodetic_to_ecef
+    lat, lon, alt = _positions(size, rng)
+    x, y, z = geodetic_to_ecef(lat, lon, alt)
+    return lambda: ecef_to_geodetic(x, y, z)
+
+
+@benchmark("magnetic_field.trace_particles", sizes=(10, 100, 1000))
+def bench_trace_particles(size, rng):
+    from magnetic_field import E_CHARGE, M_PROTON, R_E_KM, rigidity_to_speed, trace_particles
+    dirs = rng.normal(size=(size, 3))
+    dirs /= np.linalg.norm(dirs, axis=1)[:, np.newaxis]
+    speed = rigidity_to_speed(rng.uniform(1, 20, size), E_CHARGE, M_PROTON)
+    r0 = dirs * (R_E_KM + 500.0) * 1e3
+    v0 = dirs * speed[:, np.newaxis]
+    # Fixed step count, so the timing measures the per-step cost
+    return lambda: trace_particles(r0, v0, -E_CHARGE, M_PROTON, DATE, t_max=1.0,
+                                   dt=1e-4, max_steps=20)
+
+
+@benchmark("lshell.compute_lshell", sizes=(10, 100, 1000))
+def bench_compute_lshell(size, rng):
+    from lshell import compute_lshell
+    lat, lon, alt = rng.uniform(-60, 60, size), rng.uniform(-180, 180, size), rng.uniform(300, 2000, size)
+    return lambda: compute_lshell(lat, lon, alt, DATE)
+
+
+# ---------------------------------------------------
+# Drag
+# ---------------------------------------------------
+@benchmark("physics_functions.calc_drag_acceleration", sizes=(1000, 100_000, 10_000_000))
+def bench_calc_drag_acceleration(size, rng):
+    from physics_functions import calc_drag_acceleration
+    Cd = rng.uniform(2.0, 2.5, size)
+    A = rng.uniform(0.01, 20.0, size)
+    m = rng.uniform(1.0, 2000.0, size)
+    rho = 10 ** rng.uniform(-17, -11, size)
+    v_rel = rng.uniform(3000.0, 7800.0, size)
+    return lambda: calc_drag_acceleration(Cd, A, m, rho, v_rel)
+
+
+@benchmark("drag_engine.fleet_drag", sizes=(1000, 100_000, 10_000_000))
+def bench_fleet_drag(size, rng):
+    from drag_engine import fleet_drag
+    Cd = rng.uniform(2.0, 2.5, size)
+    A = rng.uniform(0.01, 20.0, size)
+    m = rng.uniform(1.0, 2000.0, size)
+    rho = 10 ** rng.uniform(-17, -11, size)
+    v_rel = rng.uniform(3000.0, 7800.0, size)
+    F10_7 = rng.uniform(70.0, 250.0, size)
+    Ap = rng.uniform(0.0, 100.0, size)
+    return lambda: fleet_drag(Cd, A, m, rho, v_rel, F10_7, Ap)
+
+
+@benchmark("drag_engine.density_time_series", sizes=(1000, 100_000, 10_000_000))
+def bench_density_time_series(size, rng):
+    from drag_engine import density_time_series
+    from space_weather_cache import IndexSeries, SpaceWeatherTable
+    days = np.datetime64("1995-01-01", "ns") + np.arange(30 * 366) * np.timedelta64(1, "D")
+    sw = SpaceWeatherTable(*(IndexSeries(days, rng.uniform(lo, hi, days.size))
+                             for lo, hi in ((70.0, 250.0), (70.0, 250.0), (0.0, 80.0))))
+    times = days[0] + np.sort(rng.integers(0, 30 * 365 * 86400, size)).astype("timedelta64[s]")
+    rho = 10 ** rng.uniform(-14, -11, size)
+    return lambda: density_time_series(rho, times, sw)
+
+
+@benchmark("drag_engine.ephemeris_drag", sizes=(1000, 100_000, 1_000_000))
+def bench_ephemeris_drag(size, rng):
+    from drag_engine import ephemeris_drag
+    times = np.datetime64("2025-01-01", "ns") + np.arange(size) * np.timedelta64(1, "s")
+    dirs = rng.normal(size=(size, 3))
+    dirs /= np.linalg.norm(dirs, axis=1)[:, np.newaxis]
+    r_eci = dirs * rng.uniform(6.6e6, 7.8e6, size)[:, np.newaxis]
+    v_eci = np.cross(dirs, rng.normal(size=(size, 3))) * 7500.0
+    return lambda: ephemeris_drag(times, r_eci, v_eci, 2.2, 1.0, 100.0)
+
+
+@benchmark("tle.to_trajectory", sizes=(10, 100, 1000))
+def bench_to_trajectory(size, rng):
+    from tle import TLECatalog, time_grid, to_trajectory
+    catalog = TLECatalog(
+        names=np.full(size, ""), satnums=np.arange(size).astype(str),
+        epochs=np.full(size, np.datetime64("2025-01-01", "ns")),
+        inc=rng.uniform(0.0, np.pi, size), raan=rng.uniform(0.0, 2 * np.pi, size),
+        ecc=rng.uniform(0.0, 0.01, size), argp=rng.uniform(0.0, 2 * np.pi, size),
+        mean_anomaly=rng.uniform(0.0, 2 * np.pi, size), mean_motion=rng.uniform(13.0, 15.5, size),
+        ndot=np.zeros(size), bstar=np.zeros(size))
+    times = time_grid("2025-01-01", "2025-01-02", np.timedelta64(60, "s"))
+    return lambda: to_trajectory(catalog, times, backend="j2")
+
+
+@benchmark("atm_density.DensityTable.query", sizes=(1000, 100_000, 1_000_000))
+def bench_density_query(size, rng):
+    from atm_density import load_or_build
+    table = load_or_build()
+    alt = rng.uniform(150.0, 1500.0, size)
+    lt = rng.uniform(0.0, 24.0, size)
+    lat = rng.uniform(-90.0, 90.0, size)
+    f107 = rng.uniform(70.0, 250.0, size)
+    ap = rng.uniform(0.0, 100.0, size)
+    return lambda: table.query(alt, lt, lat, f107, f107, ap)
+
+
+@benchmark("atmosphere_models.evaluate_batched", sizes=(1000, 100_000, 1_000_000))
+def bench_evaluate_batched(size, rng):
+    from atmosphere_models import evaluate_batched, get_model
+    model = get_model("table")
+    times = np.datetime64("2024-01-01", "ns") + np.arange(size) * np.timedelta64(60, "s")
+    lat = rng.uniform(-90.0, 90.0, size)
+    lon = rng.uniform(-180.0, 180.0, size)
+    alt = rng.uniform(150.0, 1500.0, size)
+    return lambda: evaluate_batched(model, times, lat, lon, alt)
+
+
+# ---------------------------------------------------
+# Atmospheric transmission
+# ---------------------------------------------------
+@benchmark("atmospheric.compute_transmission", sizes=(550, 10_000, 1_000_000))
+def bench_compute_transmission(size, rng):
+    from atmospheric import compute_transmission
+    wavelengths = np.sort(rng.uniform(0.25, 15.0, size))
+    return lambda: compute_transmission(40.0, -105.3, 1.6, DATE, wavelengths)
+
+
+# ---------------------------------------------------
+# CDAW catalog processing
+# ---------------------------------------------------
+def _synthetic_raw_cdaw(size, rng):
+    """Raw CDAW table with the columns process_cdaw_data expects."""
+    import pandas as pd
+
+    remarks = np.array(["", "Poor Event", "Very Poor Event", "Partial Halo", "Only C2",
+                        "Only C3", "Uncertain width", "Difficult to measure width"])
+    days = rng.integers(1, 29, size)
+    hms = rng.integers(0, [24, 60, 60], (size, 3))
+    width = rng.integers(5, 360, size).astype(str).astype(object)
+    width[rng.random(size) < 0.05] = ">360"
+    return pd.DataFrame({
+        "First C2 Appearance Date Time [UT]": [f"2005/01/{d:02d}" for d in days],
+        "First C2 Appearance Date Time [UT].1": [f"{h:02d}:{m:02d}:{s:02d}" for h, m, s in hms],
+        "Central PA [deg]": rng.integers(0, 360, size).astype(str),
+        "Angular Width [deg]": width,
+        "Linear Speed [km/s]": rng.integers(50, 3000, size).astype(str),
+        "Remarks": remarks[rng.integers(0, len(remarks), size)],
+        "Movies, plots, & links": "link",
+        "Year": 2005,
+        "Month": 1,
+    })
+
+
+@benchmark("get_cdaw_catalog.process_cdaw_data", sizes=(100, 1000, 10_000))
+def bench_process_cdaw_data(size, rng):
+    import get_cdaw_catalog
+    get_cdaw_catalog.debug = False
+    raw = _synthetic_raw_cdaw(size, rng)
+    return lambda: get_cdaw_catalog.process_cdaw_data(raw.copy())
+
+
+@benchmark("get_cdaw_catalog.continuous_day_calendar", sizes=(100, 1000, 10_000))
+def bench_continuous_day_calendar(size, rng):
+    import get_cdaw_catalog
+    get_cdaw_catalog.debug = False
+    df = get_cdaw_catalog.process_cdaw_data(_synthetic_raw_cdaw(size, rng))
+    return lambda: df.apply(get_cdaw_catalog.continuous_day_calendar, axis=1)
+
+
+@benchmark("get_cdaw_catalog.fill_with_nominal_days", sizes=(100, 1000, 5000))
+def bench_fill_with_nominal_days(size, rng):
+    import pandas as pd
+    import get_cdaw_catalog
+    df = pd.read_csv(os.path.join("Data", "CDAW_CME_Catalog_Processed.csv"), nrows=size)
+    return lambda: get_cdaw_catalog.fill_with_nominal_days(df, "Days Since Epoch")
+
+
+# ---------------------------------------------------
+# Runner
+# ---------------------------------------------------
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def time_callable(func, repeat):
+    """Run func once to warm up, then `repeat` timed runs; returns the timings [s]."""
+    func()
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+    return timings
+
+
+def run_benchmarks(names=None, repeat=DEFAULT_REPEAT, quick=False, verbose=True):
+    results, skipped = [], {}
+    for name, (sizes, setup) in BENCHMARKS.items():
+        if names and not any(n in name for n in names):
+            continue
+        for size in (sizes[:1] if quick else sizes):
+            try:
+                func = setup(size, np.random.default_rng(SEED))
+                timings = time_callable(func, repeat)
+            except ImportError as e:
+                skipped[name] = f"ImportError: {e}"
+                if verbose:
+                    print(f"{name:<45} skipped ({e})")
+                break
+            entry = {
+                "name": name,
+                "size": size,
+                "repeat": repeat,
+                "min_s": min(timings),
+                "median_s": statistics.median(timings),
+                "mean_s": statistics.fmean(timings),
+                "per_item_us": 1e6 * min(timings) / size,
+            }
+            results.append(entry)
+            if verbose:
+                print(f"{name:<45} n={size:<10} min {entry['min_s']:.4g} s "
+                      f"({entry['per_item_us']:.3g} µs/item)")
+
+    meta = {
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "seed": SEED,
+    }
+    return {"meta": meta, "results": results, "skipped": skipped}
+
+
+def compare(base_path, new_path, threshold=1.10):
+    """Print min-time ratios new/base; returns the entries slower than `threshold`."""
+    with open(base_path) as f:
+        base = {(r["name"], r["size"]): r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = {(r["name"], r["size"]): r for r in json.load(f)["results"]}
+
+    regressions = []
+    print(f"{'benchmark':<45} {'size':>10} {'base [s]':>11} {'new [s]':>11} {'ratio':>7}")
+    for key in sorted(base.keys() & new.keys()):
+        ratio = new[key]["min_s"] / base[key]["min_s"]
+        flag = "  SLOWER" if ratio > threshold else ""
+        print(f"{key[0]:<45} {key[1]:>10} {base[key]['min_s']:>11.4g} "
+              f"{new[key]['min_s']:>11.4g} {ratio:>7.2f}{flag}")
+        if ratio > threshold:
+            regressions.append((key, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("-k", dest="names", action="append",
+                        help="only run benchmarks whose name contains this (repeatable)")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--quick", action="store_true", help="smallest size only")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"),
+                        help="compare two result files instead of running")
+    parser.add_argument("--threshold", type=float, default=1.10,
+                        help="ratio above which --compare reports a regression")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return 1 if compare(*args.compare, threshold=args.threshold) else 0
+
+    report = run_benchmarks(args.names, args.repeat, args.quick)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(report['results'])} results to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vectorized coordinate conversions shared by the field, tracing and drag code.
+
+Frames
+------
+- geodetic   : WGS84 latitude, longitude [deg] and height above the ellipsoid [km]
+- geocentric : spherical radius [km], colatitude and longitude [deg]
+               (the frame IGRF is expanded in)
+- ECEF       : Earth-centred Earth-fixed Cartesian x, y, z [km]
+- ECI        : ECEF rotated about the z axis by Greenwich mean sidereal time.
+               Precession, nutation and polar motion are ignored, which is
+               adequate for drag and atmospheric co-rotation but not for
+               precise astrometry.
+
+Every function takes scalars or arrays (broadcast together) and has no
+per-point Python loop. ecef_to_geodetic uses Heikkinen's closed-form
+solution, exact to round-off without iteration.
+
+Example
+-------
+    x, y, z = geodetic_to_ecef(lat, lon, alt_km)
+    lat, lon, alt_km = ecef_to_geodetic(x, y, z)
+    r_eci, v_eci = ecef_to_eci(r_ecef, dates, v_ecef)
+"""
+
+import numpy as np
+
+# Module import (not "from ... import"): igrf_cache -> igrf_native imports
+# this module while igrf_cache is still initializing.
+import igrf_cache
+
+# WGS84 ellipsoid
+WGS84_A = 6378.137                       # equatorial radius [km]
+WGS84_F = 1 / 298.257223563              # flattening
+WGS84_E2 = WGS84_F * (2 - WGS84_F)       # first eccentricity squared
+WGS84_B = WGS84_A * (1 - WGS84_F)        # polar radius [km]
+
+OMEGA_EARTH = 7.292115e-5                # Earth rotation rate [rad/s]
+
+_J2000 = np.datetime64("2000-01-01T12:00:00", "ns")
+
+
+# ---------------------------------------------------
+# Geodetic <-> ECEF
+# ---------------------------------------------------
+def wrap_lon(lon):
+    """Wrap longitudes [deg] to [-180, 180)."""
+    return (np.asarray(lon, dtype=float) + 180.0) % 360.0 - 180.0
+
+
+def geodetic_to_ecef(lat, lon, alt_km):
+    """ECEF (x, y, z) [km] from WGS84 latitude, longitude [deg] and height [km]."""
+    lat_rad, lon_rad = np.radians(lat), np.radians(lon)
+    sin_lat, cos_lat = np.sin(lat_rad), np.cos(lat_rad)
+    n = WGS84_A / np.sqrt(1.0 - WGS84_E2 * sin_lat**2)   # prime vertical radius
+    x = (n + alt_km) * cos_lat * np.cos(lon_rad)
+    y = (n + alt_km) * cos_lat * np.sin(lon_rad)
+    z = (n * (1.0 - WGS84_E2) + alt_km) * sin_lat
+    return x, y, z
+
+
+def ecef_to_geodetic(x, y, z):
+    """
+    WGS84 latitude, longitude [deg] and height [km] from ECEF (x, y, z) [km].
+
+    Closed form (Heikkinen 1982); valid everywhere except within a few km
+    of the Earth's centre.
+    """
+    x, y, z = np.asarray(x, dtype=float), np.asarray(y, dtype=float), np.asarray(z, dtype=float)
+    a, b, e2 = WGS84_A, WGS84_B, WGS84_E2
+    ep2 = (a**2 - b**2) / b**2
+    p2 = x**2 + y**2
+    p = np.sqrt(p2)
+    z2 = z**2
+
+    F = 54.0 * b**2 * z2
+    G = p2 + (1.0 - e2) * z2 - e2 * (a**2 - b**2)
+    c = e2**2 * F * p2 / G**3
+    s = np.cbrt(1.0 + c + np.sqrt(c**2 + 2.0 * c))
+    P = F / (3.0 * (s + 1.0 / s + 1.0)**2 * G**2)
+    Q = np.sqrt(1.0 + 2.0 * e2**2 * P)
+    r0 = (-P * e2 * p / (1.0 + Q)
+          + np.sqrt(np.maximum(0.5 * a**2 * (1.0 + 1.0 / Q)
+                               - P * (1.0 - e2) * z2 / (Q * (1.0 + Q)) - 0.5 * P * p2, 0.0)))
+    U = np.sqrt((p - e2 * r0)**2 + z2)
+    V = np.sqrt((p - e2 * r0)**2 + (1.0 - e2) * z2)
+    z0 = b**2 * z / (a * V)
+
+    lat = np.degrees(np.arctan2(z + ep2 * z0, p))
+    lon = np.degrees(np.arctan2(y, x))
+    alt_km = U * (1.0 - b**2 / (a * V))
+    return lat, lon, alt_km
+
+
+def enu_to_ecef(lat, lon, e, n, u, dtype=None):
+    """
+    Rotate local East/North/Up vector components to ECEF (X, Y, Z).
+
+    Works on scalars or arrays; the trig terms of lat/lon are computed once
+    per point. With `dtype` (e.g. np.float32) the rotation runs in that
+    precision.
+    """
+    lat_rad = np.radians(np.asarray(lat, dtype=dtype))
+    lon_rad = np.radians(np.asarray(lon, dtype=dtype))
+    sin_lat, cos_lat = np.sin(lat_rad), np.cos(lat_rad)
+    sin_lon, cos_lon = np.sin(lon_rad), np.cos(lon_rad)
+
+    X = -sin_lat*cos_lon*n - sin_lon*e + cos_lat*cos_lon*u
+    Y = -sin_lat*sin_lon*n + cos_lon*e + cos_lat*sin_lon*u
+    Z = cos_lat*n + sin_lat*u
+    return X, Y, Z
+
+
+def ecef_to_enu(lat, lon, X, Y, Z):
+    """Rotate ECEF vector components to local East/North/Up (inverse of enu_to_ecef)."""
+    lat_rad, lon_rad = np.radians(lat), np.radians(lon)
+    sin_lat, cos_lat = np.sin(lat_rad), np.cos(lat_rad)
+    sin_lon, cos_lon = np.sin(lon_rad), np.cos(lon_rad)
+
+    e = -sin_lon*X + cos_lon*Y
+    n = -sin_lat*cos_lon*X - sin_lat*sin_lon*Y + cos_lat*Z
+    u = cos_lat*cos_lon*X + cos_lat*sin_lon*Y + sin_lat*Z
+    return e, n, u
+
+
+# ---------------------------------------------------
+# Geocentric spherical
+# ---------------------------------------------------
+def geodetic_to_geocentric(lat, alt_km):
+    """Geocentric radius [km] and colatitude [deg] of a WGS84 latitude and height."""
+    lat_rad = np.radians(lat)
+    sin_lat, cos_lat = np.sin(lat_rad), np.cos(lat_rad)
+    n = WGS84_A / np.sqrt(1.0 - WGS84_E2 * sin_lat**2)
+    rho = (n + alt_km) * cos_lat                 # distance from the rotation axis
+    z = (n * (1.0 - WGS84_E2) + alt_km) * sin_lat
+    return np.hypot(rho, z), np.degrees(np.arctan2(rho, z))
+
+
+def geocentric_to_geodetic_vector(lat, theta, v_theta, v_r):
+    """
+    Rotate (theta, r) vector components at geocentric colatitude theta [deg]
+    to (north, up) relative to the ellipsoid at geodetic latitude lat [deg].
+    """
+    psi = np.radians(lat - (90.0 - np.asarray(theta)))   # geodetic - geocentric latitude
+    sin_psi, cos_psi = np.sin(psi), np.cos(psi)
+    return -cos_psi * v_theta - sin_psi * v_r, -sin_psi * v_theta + cos_psi * v_r
+
+
+def ecef_to_spherical(x, y, z):
+    """Geocentric radius, colatitude [deg] and longitude [deg] of ECEF (x, y, z)."""
+    r = np.sqrt(x**2 + y**2 + z**2)
+    theta = np.degrees(np.arccos(np.clip(z / r, -1.0, 1.0)))
+    return r, theta, np.degrees(np.arctan2(y, x))
+
+
+def spherical_to_ecef(r, theta, phi):
+    """ECEF (x, y, z) of geocentric radius, colatitude and longitude [deg]."""
+    theta_rad, phi_rad = np.radians(theta), np.radians(phi)
+    sin_t = np.sin(theta_rad)
+    return r * sin_t * np.cos(phi_rad), r * sin_t * np.sin(phi_rad), r * np.cos(theta_rad)
+
+
+def spherical_to_ecef_vector(theta, phi, v_r, v_theta, v_phi):
+    """Rotate (r, theta, phi) vector components at colatitude/longitude [deg] to ECEF."""
+    theta_rad, phi_rad = np.radians(theta), np.radians(phi)
+    sin_t, cos_t = np.sin(theta_rad), np.cos(theta_rad)
+    sin_p, cos_p = np.sin(phi_rad), np.cos(phi_rad)
+    X = v_r*sin_t*cos_p + v_theta*cos_t*cos_p - v_phi*sin_p
+    Y = v_r*sin_t*sin_p + v_theta*cos_t*sin_p + v_phi*cos_p
+    Z = v_r*cos_t - v_theta*sin_t
+    return X, Y, Z
+
+
+# ---------------------------------------------------
+# ECEF <-> ECI
+# ---------------------------------------------------
+def gmst(dates):
+    """
+    Greenwich mean sidereal angle [rad] (IAU 1982, UT1 taken as UTC).
+
+    dates may be datetimes, datetime64 values or decimal years.
+    """
+    t = igrf_cache.as_datetime64(dates)
+    days = (t - _J2000) / np.timedelta64(1, "D")
+    centuries = days / 36525.0
+    deg = (280.46061837 + 360.98564736629 * days
+           + 0.000387933 * centuries**2 - centuries**3 / 38710000.0)
+    return np.radians(np.mod(deg, 360.0))
+
+
+def _rotate_z(vectors, angle):
+    """Rotate (..., 3) vectors about z by `angle` [rad] (broadcast over the leading axes)."""
+    vectors = np.asarray(vectors, dtype=float)
+    cos_a, sin_a = np.cos(angle), np.sin(angle)
+    out = np.empty(np.broadcast_shapes(vectors.shape, np.shape(angle) + (3,)))
+    out[..., 0] = cos_a * vectors[..., 0] - sin_a * vectors[..., 1]
+    out[..., 1] = sin_a * vectors[..., 0] + cos_a * vectors[..., 1]
+    out[..., 2] = vectors[..., 2]
+    return out
+
+
+def _omega_cross(r):
+    """Earth rotation vector crossed with (..., 3) positions."""
+    out = np.zeros_like(r)
+    out[..., 0] = -OMEGA_EARTH * r[..., 1]
+    out[..., 1] = OMEGA_EARTH * r[..., 0]
+    return out
+
+
+def ecef_to_eci(r_ecef, dates, v_ecef=None):
+    """
+    ECEF positions (and velocities) to ECI.
+
+    Parameters:
+        r_ecef (array): (..., 3) positions, any length unit
+        dates: one date or one per position (datetime, datetime64 or decimal year)
+        v_ecef (array, optional): (..., 3) Earth-fixed velocities [same unit / s]
+
+    Returns:
+        r_eci, or (r_eci, v_eci) when v_ecef is given; v_eci includes the
+        Earth-rotation term ω × r.
+    """
+    angle = gmst(dates)
+    r_eci = _rotate_z(r_ecef, angle)
+    if v_ecef is None:
+        return r_eci
+    return r_eci, _rotate_z(v_ecef, angle) + _omega_cross(r_eci)
+
+
+def eci_to_ecef(r_eci, dates, v_eci=None):
+    """Inverse of ecef_to_eci: ECI positions (and inertial velocities) to ECEF."""
+    angle = -gmst(dates)
+    r_eci = np.asarray(r_eci, dtype=float)
+    r_ecef = _rotate_z(r_eci, angle)
+    if v_eci is None:
+        return r_ecef
+    return r_ecef, _rotate_z(np.asarray(v_eci, dtype=float) - _omega_cross(r_eci), angle)
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    n = 1_000_000
+    lat, lon, alt = rng.uniform(-90, 90, n), rng.uniform(-180, 180, n), rng.uniform(-5, 40000, n)
+    t0 = time.perf_counter()
+    x, y, z = geodetic_to_ecef(lat, lon, alt)
+    t1 = time.perf_counter()
+    lat2, lon2, alt2 = ecef_to_geodetic(x, y, z)
+    t2 = time.perf_counter()
+    print(f"geodetic_to_ecef: {n / (t1 - t0) / 1e6:.1f} M points/s, "
+          f"ecef_to_geodetic: {n / (t2 - t1) / 1e6:.1f} M points/s")
+    print(f"round trip: max |dlat| {np.abs(lat2 - lat).max():.2e} deg, "
+          f"max |dalt| {np.abs(alt2 - alt).max():.2e} km")
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Numerical cutoff rigidities by particle backtracing.
+
+A proton arriving vertically at a site is followed backwards in time by
+launching its antiparticle (reversed charge) vertically upward from the
+site with magnetic_field.trace_particles. A trajectory is *allowed* if it
+escapes to `escape_radius_re` Earth radii and *forbidden* if it re-enters
+the atmosphere (below TOP_OF_ATMOSPHERE_KM) or stays trapped until the
+flight-time limit.
+
+Repeating this over a descending rigidity ladder gives the penumbra:
+
+    RU : last allowed rigidity before the first forbidden one
+    RL : lowest allowed rigidity (everything below is forbidden)
+    Rc : effective cutoff, RU minus the widths of the allowed rungs
+         between RL and RU (Cooke et al. 1991)
+
+All rungs of a site are traced together as one particle batch. Sites
+(and, for long ladders, chunks of rungs) are spread over a process pool,
+and every finished site is stored under DEFAULT_CACHE_DIR, keyed by the
+site, epoch, ladder and tracing options, so repeated queries are free.
+
+GTF.compute_cutoff_rigidity(..., method="backtrace") uses this module in
+place of the Störmer estimate.
+
+Example
+-------
+    result = backtrace_cutoff([40.0, 0.0], [-105.3, 100.0], 20.0, datetime(2025, 1, 1))
+    print(result["Rc"], result["RU"], result["RL"])
+
+Reference: Cooke, D. J. et al. (1991), On cosmic-ray cut-off terminology,
+Il Nuovo Cimento C, 14, 213–234.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from coordinates import enu_to_ecef, geodetic_to_ecef
+from igrf_cache import decimal_year
+from magnetic_field import ESCAPED, E_CHARGE, M_PROTON, rigidity_to_speed, trace_particles
+
+DEFAULT_CACHE_DIR = os.path.join("Data", "backtrace_cache")
+TOP_OF_ATMOSPHERE_KM = 20.0  # launch / re-entry altitude [km]
+
+# Descending rigidity ladder [GV]
+DEFAULT_R_MAX = 20.0
+DEFAULT_R_MIN = 0.1
+DEFAULT_R_STEP = 0.1
+
+# Tracing options (see magnetic_field.trace_particles)
+DEFAULT_TRACE_OPTIONS = {
+    "t_max": 2.0,             # s of flight before a particle counts as trapped
+    "gyro_fraction": 0.05,
+    "escape_radius_re": 10.0,
+    "max_steps": 50000,
+}
+
+# Bumped when tracing changes so stale cache entries are not reused
+CACHE_VERSION = 2
+
+
+def rigidity_ladder(r_max=DEFAULT_R_MAX, r_min=DEFAULT_R_MIN, step=DEFAULT_R_STEP):
+    """Descending rigidity ladder [GV] from r_max to r_min."""
+    n = int(round((r_max - r_min) / step)) + 1
+    return r_max - step * np.arange(n)
+
+
+def trace_ladder(lat, lon, alt_km, date, rigidities, trace_options=None):
+    """
+    Backtrace vertically arriving protons at one site for every rigidity.
+
+    Returns:
+        bool array, True where the trajectory is allowed (escapes).
+    """
+    options = dict(DEFAULT_TRACE_OPTIONS, **(trace_options or {}))
+    rigidities = np.asarray(rigidities, dtype=float)
+    launch_alt = max(float(alt_km), TOP_OF_ATMOSPHERE_KM)
+    xyz = np.array(geodetic_to_ecef(float(lat), float(lon), launch_alt)) * 1e3
+    up = np.array(enu_to_ecef(float(lat), float(lon), 0.0, 0.0, 1.0))
+
+    speed = rigidity_to_speed(rigidities, E_CHARGE, M_PROTON)
+    r0 = np.broadcast_to(xyz, (rigidities.size, 3))
+    v0 = speed[:, np.newaxis] * up[np.newaxis, :]
+    # Reversed charge and velocity: the antiproton leaves along the arrival path.
+    result = trace_particles(r0, v0, -E_CHARGE, M_PROTON, date,
+                             min_alt_km=TOP_OF_ATMOSPHERE_KM, **options)
+    return result["status"] == ESCAPED
+
+
+def penumbra(rigidities, allowed):
+    """
+    Upper, lower and effective cutoff [GV] from a descending ladder.
+
+    Parameters:
+        rigidities (array): descending rigidities [GV]
+        allowed (array): bool, allowed trajectories per rigidity
+
+    Returns:
+        (Rc, RU, RL)
+    """
+    rigidities = np.asarray(rigidities, dtype=float)
+    allowed = np.asarray(allowed, dtype=bool)
+    if not allowed.any():
+        return rigidities[0], rigidities[0], rigidities[0]
+    forbidden = np.flatnonzero(~allowed)
+    if forbidden.size == 0:
+        return rigidities[-1], rigidities[-1], rigidities[-1]
+
+    first_forbidden = forbidden[0]
+    last_allowed = np.flatnonzero(allowed)[-1]
+    RU = rigidities[max(first_forbidden - 1, 0)]
+    RL = rigidities[last_allowed]
+    # Width of each rung: distance to the next higher rigidity
+    widths = np.abs(np.diff(rigidities, prepend=2 * rigidities[0] - rigidities[1]))
+    band = slice(first_forbidden, last_allowed + 1)
+    Rc = RU - np.sum(widths[band][allowed[band]])
+    return Rc, RU, RL
+
+
+class BacktraceCache:
+    """Per-site ladder results stored as .npz files in `directory`."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+
+    @staticmethod
+    def key(lat, lon, alt_km, year, rigidities, trace_options):
+        site = [round(float(lat), 4), round(float(lon) % 360.0, 4), round(float(alt_km), 3),
+                round(float(year), 4)]
+        ladder = np.round(np.asarray(rigidities, dtype=float), 6).tolist()
+        payload = json.dumps([CACHE_VERSION, site, ladder, sorted(trace_options.items())])
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return data["allowed"]
+
+    def put(self, key, allowed):
+        os.makedirs(self.directory, exist_ok=True)
+        np.savez(self._path(key), allowed=np.asarray(allowed, dtype=bool))
+
+
+def backtrace_cutoff(lat, lon, alt_km, dates, rigidities=None, trace_options=None,
+                     max_workers=None, rungs_per_task=None, cache_dir=DEFAULT_CACHE_DIR,
+                     executor=None):
+    """
+    Effective vertical cutoff rigidity by backtracing, for N sites.
+
+    Parameters:
+        lat, lon, alt_km (array_like): site positions [deg, deg, km], broadcast
+        dates: datetimes, datetime64 values or decimal years (one or per site)
+        rigidities (array, optional): descending ladder [GV], default
+            rigidity_ladder()
+        trace_options (dict, optional): overrides for DEFAULT_TRACE_OPTIONS
+        max_workers (int, optional): process pool size (default os.cpu_count())
+        rungs_per_task (int, optional): split each ladder into tasks of this
+            many rungs so a few sites still use every worker
+        cache_dir (str or None): disk cache directory; None disables caching
+        executor (Executor, optional): existing pool to submit to
+
+    Returns:
+        dict with "Rc", "RU", "RL" (N,) [GV], "R" (M,) ladder and "allowed" (N, M).
+    """
+    rigidities = rigidity_ladder() if rigidities is None else np.asarray(rigidities, dtype=float)
+    options = dict(DEFAULT_TRACE_OPTIONS, **(trace_options or {}))
+    lat, lon, alt_km, years = (a.ravel() for a in np.broadcast_arrays(
+        np.asarray(lat, dtype=float), np.asarray(lon, dtype=float),
+        np.asarray(alt_km, dtype=float), np.asarray(decimal_year(dates), dtype=float)))
+    n_sites = lat.size
+    allowed = np.zeros((n_sites, rigidities.size), dtype=bool)
+
+    cache = BacktraceCache(cache_dir) if cache_dir else None
+    keys = [BacktraceCache.key(lat[i], lon[i], alt_km[i], years[i], rigidities, options)
+            for i in range(n_sites)]
+    todo = []
+    for i, key in enumerate(keys):
+        cached = cache.get(key) if cache else None
+        if cached is not None:
+            allowed[i] = cached
+        else:
+            todo.append(i)
+
+    if todo:
+        max_workers = max_workers or os.cpu_count() or 1
+        if rungs_per_task is None:
+            # About one task per worker when there are fewer sites than workers
+            rungs_per_task = -(-rigidities.size * len(todo) // max_workers)
+        rungs_per_task = max(1, min(rungs_per_task, rigidities.size))
+
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {}
+            for i in todo:
+                for start in range(0, rigidities.size, rungs_per_task):
+                    rungs = rigidities[start:start + rungs_per_task]
+                    future = executor.submit(trace_ladder, lat[i], lon[i], alt_km[i],
+                                             years[i], rungs, options)
+                    futures[future] = (i, start)
+            for future, (i, start) in futures.items():
+                result = future.result()
+                allowed[i, start:start + result.size] = result
+        finally:
+            if own_executor:
+                executor.shutdown()
+
+        if cache:
+            for i in todo:
+                cache.put(keys[i], allowed[i])
+
+    cutoffs = np.array([penumbra(rigidities, allowed[i]) for i in range(n_sites)]).reshape(n_sites, 3)
+    return {"Rc": cutoffs[:, 0], "RU": cutoffs[:, 1], "RL": cutoffs[:, 2],
+            "R": rigidities, "allowed": allowed}
+
+
+if __name__ == "__main__":
+    import time
+    from datetime import datetime
+
+    t0 = time.perf_counter()
+    result = backtrace_cutoff([40.0, 0.0], [-105.3, 100.0], 20.0, datetime(2025, 1, 1),
+                              rigidities=rigidity_ladder(20.0, 1.0, 0.5))
+    print(f"Backtraced in {time.perf_counter() - t0:.1f} s")
+    for name in ("Rc", "RU", "RL"):
+        print(name, result[name])
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tiered geomagnetic field model with automatic accuracy switching.
+
+Tiers, cheapest first:
+
+    "dipole"    eccentric (offset, tilted) dipole in closed form
+    "degree-N"  IGRF truncated at degree N, for N in TRUNCATION_DEGREES
+    "igrf"      full IGRF (igrf_native)
+
+`tiered_igrf` picks, per point, the cheapest tier whose error bound meets a
+caller-supplied tolerance, and reports the tier and bound it used.
+magnetic_field.get_B_field and GTF.geomagnetic_latitude take the same
+`tolerance` argument and go through it.
+
+Error bounds
+------------
+For every epoch the field of each single degree n is sampled on the IGRF
+reference sphere (r = a) and C_n is its largest magnitude there (times
+SAFETY_FACTOR for the sampling). Outside the sphere a degree-n field
+falls off as (a/r)^(n+2), so leaving out every degree above N costs at most
+
+    bound_N(r) = sum over n > N of C_n (a/r)^(n+2)      (leading term (a/r)^(N+3))
+
+The dipole tier's residual (full IGRF minus eccentric dipole) has no
+degree-1 part; it is sampled the same way and scaled by (a/r)^4. Bounds
+are relative to full IGRF, not to the true field.
+
+Example
+-------
+    Be, Bn, Bu, tier, bound = tiered_igrf(lon, lat, alt_km, date, tolerance=200.0)
+    B = get_B_field(lat, lon, alt_km, date, tolerance=200.0)   # adds "tier", "error_bound"
+
+Reference: Fraser-Smith, A. C. (1987), Centered and eccentric geomagnetic
+dipoles and their poles, 1600–1985, Rev. Geophys., 25(1), 1–16.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+import igrf_native
+from coordinates import (ecef_to_enu, geodetic_to_ecef, geodetic_to_geocentric,
+                         spherical_to_ecef, spherical_to_ecef_vector)
+from igrf_cache import POLE_LIMIT, as_datetime64
+
+DIPOLE = "dipole"
+IGRF = "igrf"
+TRUNCATION_DEGREES = (2, 4, 6, 8)
+TIERS = (DIPOLE,) + tuple(f"degree-{n}" for n in TRUNCATION_DEGREES) + (IGRF,)
+
+SAMPLE_POINTS = 4000     # points on the reference sphere per epoch
+SAFETY_FACTOR = 1.2      # margin on sampled maxima
+EPOCH_CACHE_SIZE = 64
+
+
+def _tier_degree(tier):
+    """Truncation degree of a tier (None for full IGRF)."""
+    if tier == IGRF:
+        return None
+    if tier == DIPOLE or tier not in TIERS:
+        raise ValueError(f"Unknown field tier {tier!r}; expected one of {TIERS}")
+    return int(tier.split("-")[1])
+
+
+def _fibonacci_sphere(n):
+    """Colatitudes and longitudes [deg] of n near-uniform points on a sphere."""
+    i = np.arange(n) + 0.5
+    theta = np.degrees(np.arccos(1.0 - 2.0 * i / n))
+    phi = np.degrees(np.pi * (1.0 + 5**0.5) * i) % 360.0 - 180.0
+    return theta, phi
+
+
+# ---------------------------------------------------
+# Eccentric dipole
+# ---------------------------------------------------
+def eccentric_dipole(date):
+    """
+    Eccentric dipole of the IGRF epoch.
+
+    Returns:
+        (moment, offset): moment vector (g11, h11, g10) [nT] and ECEF offset
+        of the dipole centre [km]
+    """
+    model = igrf_native.get_model()
+    g, h = model.coefficients(date)
+
+    def coeff(values, n, m):
+        return values[(model.n == n) & (model.m == m)][0]
+
+    g10, g11, h11 = coeff(g, 1, 0), coeff(g, 1, 1), coeff(h, 1, 1)
+    g20, g21, g22 = coeff(g, 2, 0), coeff(g, 2, 1), coeff(g, 2, 2)
+    h21, h22 = coeff(h, 2, 1), coeff(h, 2, 2)
+    B0_sq = g10**2 + g11**2 + h11**2
+    s3 = np.sqrt(3.0)
+    L0 = 2 * g10 * g20 + s3 * (g11 * g21 + h11 * h21)
+    L1 = -g11 * g20 + s3 * (g10 * g21 + g11 * g22 + h11 * h22)
+    L2 = -h11 * g20 + s3 * (g10 * h21 - h11 * g22 + g11 * h22)
+    E = (L0 * g10 + L1 * g11 + L2 * h11) / (4 * B0_sq)
+    offset = igrf_native.RE_KM / (3 * B0_sq) * np.array([L1 - g11 * E, L2 - h11 * E, L0 - g10 * E])
+    return np.array([g11, h11, g10]), offset
+
+
+def _dipole_ecef(xyz_km, moment, offset):
+    """Field [nT] of a dipole with IGRF-style moment (g11, h11, g10) centred at `offset`."""
+    rel = np.atleast_2d(xyz_km) - offset
+    r = np.linalg.norm(rel, axis=1)
+    r_hat = rel / r[:, np.newaxis]
+    m_dot_r = r_hat @ moment
+    return (igrf_native.RE_KM / r)[:, np.newaxis]**3 * (3 * m_dot_r[:, np.newaxis] * r_hat - moment)
+
+
+# ---------------------------------------------------
+# Per-epoch error bounds
+# ---------------------------------------------------
+class TierBounds:
+    """
+    Sampled field amplitudes of one epoch on the reference sphere.
+
+    Attributes:
+        degree_amplitude (ndarray): C_n [nT] for n = 0..nmax (C_0 = 0)
+        dipole_amplitude (float): largest |IGRF - eccentric dipole| [nT]
+    """
+
+    def __init__(self, date, n_points=SAMPLE_POINTS):
+        model = igrf_native.get_model()
+        theta, phi = _fibonacci_sphere(n_points)
+        g, h = model.coefficients(date)
+        P, dP = model.legendre(theta)
+        mphi = np.radians(phi)[:, np.newaxis] * model.m
+        gh = g * np.cos(mphi) + h * np.sin(mphi)
+        hg = h * np.cos(mphi) - g * np.sin(mphi)
+
+        # Per-coefficient field terms at r = a, summed by degree
+        degree_sum = (model.n[:, np.newaxis] == np.arange(model.nmax + 1)).astype(float)
+        Br = ((model.n + 1) * P * gh) @ degree_sum
+        Btheta = (-dP * gh) @ degree_sum
+        Bphi = (-model.m * P * hg / np.sin(np.radians(theta))[:, np.newaxis]) @ degree_sum
+        self.degree_amplitude = SAFETY_FACTOR * np.sqrt(Br**2 + Btheta**2 + Bphi**2).max(axis=0)
+
+        xyz = np.column_stack(spherical_to_ecef(igrf_native.RE_KM, theta, phi))
+        B_full = np.column_stack(spherical_to_ecef_vector(
+            theta, phi, Br.sum(axis=1), Btheta.sum(axis=1), Bphi.sum(axis=1)))
+        B_dip = _dipole_ecef(xyz, *eccentric_dipole(date))
+        self.dipole_amplitude = SAFETY_FACTOR * float(np.linalg.norm(B_full - B_dip, axis=1).max())
+
+    def bound(self, tier, r_km):
+        """Error bound [nT] of `tier` relative to full IGRF at geocentric radius r [km]."""
+        ratio = igrf_native.RE_KM / np.asarray(r_km, dtype=float)
+        if tier == DIPOLE:
+            return self.dipole_amplitude * ratio**4
+        degree = _tier_degree(tier)
+        if degree is None:
+            return np.zeros(ratio.shape)
+        omitted = np.arange(degree + 1, self.degree_amplitude.size)
+        return np.sum(self.degree_amplitude[omitted] * ratio[..., np.newaxis]**(omitted + 2), axis=-1)
+
+
+@lru_cache(maxsize=EPOCH_CACHE_SIZE)
+def _bounds_for_day(day):
+    return TierBounds(day)
+
+
+def tier_bounds(date):
+    """TierBounds of the epoch of `date` (cached per day)."""
+    return _bounds_for_day(np.ravel(as_datetime64(date).astype("datetime64[D]"))[0])
+
+
+# ---------------------------------------------------
+# Evaluation
+# ---------------------------------------------------
+def tier_field(lat, lon, alt_km, date, tier):
+    """(Be, Bn, Bu) [nT] of one tier at geodetic positions (flat arrays)."""
+    lat, lon, alt_km = (np.ravel(a).astype(float) for a in (lat, lon, alt_km))
+    if tier == DIPOLE:
+        xyz = np.column_stack(geodetic_to_ecef(lat, lon, alt_km))
+        B = _dipole_ecef(xyz, *eccentric_dipole(date))
+        return ecef_to_enu(lat, lon, B[:, 0], B[:, 1], B[:, 2])
+    Be, Bn, Bu = igrf_native.igrf(lon, lat, alt_km, date, max_degree=_tier_degree(tier))
+    return Be[0], Bn[0], Bu[0]
+
+
+def dip_latitude_bound(Be, Bn, Bu, bound):
+    """
+    Worst-case dip-latitude error [deg] for a field error `bound` [nT].
+
+    The field direction can turn by at most asin(bound / |B_true|), with
+    |B_true| >= |B| - bound, and dip latitude changes at most twice as fast
+    as inclination.
+    """
+    B = np.sqrt(Be**2 + Bn**2 + Bu**2)
+    margin = np.where(B > bound, B - bound, np.inf)
+    turn = np.where(B > bound, np.degrees(np.arcsin(np.clip(bound / margin, 0.0, 1.0))), 90.0)
+    return np.minimum(2.0 * turn, 180.0)
+
+
+def tiered_igrf(lon, lat, alt_km, date, tolerance, angular=False, tiers=TIERS):
+    """
+    IGRF (Be, Bn, Bu) [nT] from the cheapest tier meeting `tolerance`.
+
+    Parameters:
+        lon, lat, alt_km (array_like): geodetic positions [deg, deg, km], broadcast
+        date: one datetime, datetime64 or decimal year
+        tolerance (float): acceptable field error [nT], or dip-latitude
+            error [deg] with angular=True
+        angular (bool): judge tiers by dip_latitude_bound instead of |ΔB|
+        tiers (sequence): tiers to try, cheapest first; full IGRF is always
+            the final fallback
+
+    Returns:
+        (Be, Bn, Bu, tier, bound): field arrays of shape (1, *shape) like
+        ppigrf.igrf, the tier name per point and its error bound per point
+        ([nT], or [deg] with angular=True).
+    """
+    lon, lat, alt_km = np.broadcast_arrays(np.asarray(lon, dtype=float),
+                                           np.asarray(lat, dtype=float),
+                                           np.asarray(alt_km, dtype=float))
+    shape = lat.shape
+    lat = np.clip(lat.ravel(), -POLE_LIMIT, POLE_LIMIT)
+    lon, alt_km = lon.ravel(), alt_km.ravel()
+    r_km, _ = geodetic_to_geocentric(lat, alt_km)
+    bounds = tier_bounds(date)
+
+    B = np.empty((3, lat.size))
+    tier_used = np.full(lat.size, IGRF, dtype=object)
+    bound_used = np.zeros(lat.size)
+    remaining = np.arange(lat.size)
+    for tier in tuple(t for t in tiers if t != IGRF) + (IGRF,):
+        if remaining.size == 0:
+            break
+        field_bound = bounds.bound(tier, r_km[remaining])
+        if tier != IGRF and not angular:
+            # A field-error tolerance is decided by radius alone; skip evaluating misses
+            remaining_ok = field_bound <= tolerance
+            if not remaining_ok.any():
+                continue
+            idx = remaining[remaining_ok]
+            Be, Bn, Bu = tier_field(lat[idx], lon[idx], alt_km[idx], date, tier)
+            point_bound, ok = field_bound[remaining_ok], np.ones(idx.size, dtype=bool)
+        else:
+            idx = remaining
+            Be, Bn, Bu = tier_field(lat[idx], lon[idx], alt_km[idx], date, tier)
+            point_bound = dip_latitude_bound(Be, Bn, Bu, field_bound) if angular else field_bound
+            ok = (point_bound <= tolerance) | (tier == IGRF)
+        idx = idx[ok]
+        B[:, idx] = Be[ok], Bn[ok], Bu[ok]
+        tier_used[idx] = tier
+        bound_used[idx] = point_bound[ok]
+        remaining = np.setdiff1d(remaining, idx, assume_unique=True)
+
+    outshape = (1,) + shape
+    return (B[0].reshape(outshape), B[1].reshape(outshape), B[2].reshape(outshape),
+            tier_used.reshape(shape), bound_used.reshape(shape))
+
+
+if __name__ == "__main__":
+    import time
+    from datetime import datetime
+
+    date = datetime(2025, 11, 9)
+    rng = np.random.default_rng(0)
+    n = 20000
+    lat, lon, alt = rng.uniform(-89, 89, n), rng.uniform(-180, 180, n), rng.uniform(0, 36000, n)
+    exact = np.array(igrf_native.igrf(lon, lat, alt, date))[:, 0]
+    r_km, _ = geodetic_to_geocentric(lat, alt)
+    for tier in TIERS:
+        t0 = time.perf_counter()
+        approx = np.array(tier_field(lat, lon, alt, date, tier))
+        elapsed = time.perf_counter() - t0
+        err = np.linalg.norm(approx - exact, axis=0)
+        bound = tier_bounds(date).bound(tier, r_km)
+        print(f"{tier:<10} {elapsed * 1e3:7.1f} ms  max error {err.max():9.2f} nT  "
+              f"error/bound max {np.max(err / np.maximum(bound, 1e-12)):.2f}")
@@ -9,13 +9,10 @@ Python Code to Download the Full SOHO / LASCO CDAW CME Catalog
 """
 
 import pandas as pd
-import requests
 # from bs4 import BeautifulSoup
 from datetime import datetime
 import os
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
 
 def download_cdaw_catalog():
     """
@@ -25,6 +22,8 @@ def download_cdaw_catalog():
     Data source:
     https://cdaw.gsfc.nasa.gov/CME_list/
     """
+    import requests
+
     # https://cdaw.gsfc.nasa.gov/CME_list/
     # base_url = "https://cdaw.gsfc.nasa.gov/CME_list/UNIVERSAL/"
     base_url = r"https://cdaw.gsfc.nasa.gov/CME_list/UNIVERSAL_ver2/"
@@ -177,6 +176,9 @@ def find_non_numeric_rows(df, col):
     print(rows_with_non_numeric[col])
     
 def plot_missing_data(df):
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
     sns.heatmap(df.isna(), cmap='viridis')
     plt.show()
     
@@ -243,103 +245,6 @@ debug = True
 # df.to_csv(f, index=False)
 
 
-# =============================================================================
-# ML Model
-# =============================================================================
-df = load_cdaw_catalog_processed()
-
-
-# for col in df.drop('Days Since Epoch', axis=1):
-#     plt.figure()
-#     plt.title(col)
-#     plt.scatter(df['Days Since Epoch'], df[col], s=2)
-#     plt.show()
-    
-    
-# sns.scatterplot(df, x='Days Since Epoch', y='Central PA [deg]', hue='Measurement Difficulties')
-
-
-
-# plt.figure(figsize=(10,6))
-# sns.scatterplot(good_events, x='Days Since Epoch', y='Angular Width [deg]', hue='Measurement Difficulties')
-# plt.show()
-# plt.close()
-
-
-# plt.figure(figsize=(10,6))
-# sns.scatterplot(good_events[-100:], x='Days Since Epoch', y='Angular Width [deg]', hue='Measurement Difficulties')
-# plt.show()
-# plt.close()
-
-# plt.figure(figsize=(10,6))
-# sns.scatterplot(df, x='Days Since Epoch', y='Central PA [deg]', hue='Poor Event')
-# plt.show()
-# plt.close()
-
-df['Mild Event'] = df['Poor Event'] | df['Very Poor Event'] | df['Only C2']
-df.drop(['Poor Event', 'Very Poor Event', 'Only C2'], axis=1, inplace=True)
-good_events = df.loc[(df['Mild Event']==0)].drop('Mild Event', axis=1)
-
-boolean_cols = ['Mild Event', 'Measurement Difficulties']
-value_cols = ['Central PA [deg]', 'Angular Width [deg]', 'Linear Speed [km/s]',
-       '2nd-order Speed at final height [km/s]',
-       '2nd-order Speed at 20 Rs [km/s]', 'MPA [deg]', 'Days Since Epoch']
-
-# this_bool = boolean_cols[0]
-# other_bool = boolean_cols[1]
-# plt.figure(figsize=(6,6))
-# sns.pairplot(df.drop(other_bool, axis=1), hue=this_bool, s=4)
-# plt.savefig(os.path.join("Images", "CMEs_pairplot0.png"), dpi=300)
-# plt.close()
-
-# this_bool = boolean_cols[1]
-# other_bool = boolean_cols[0]
-# plt.figure(figsize=(8,8))
-# sns.pairplot(df.drop(other_bool, axis=1), hue=this_bool)
-# plt.savefig(os.path.join("Images", "CMEs_pairplot1.png"), dpi=300)
-# plt.close()
-
-
-# plt.figure(figsize=(6,6))
-# sns.pairplot(good_events.drop("Measurement Difficulties", axis=1))
-# plt.savefig(os.path.join("Images", "CMEs_pairplot2.png"), dpi=300)
-# plt.close()
-
-
-# plt.figure(figsize=(6,6))
-# sns.scatterplot(good_events, x='Days Since Epoch', y='Central PA [deg]')
-# plt.show()
-# plt.close()
-
-
-df['CPA Range'] = df['Central PA [deg]'].apply(lambda x: "180-360 deg" if x >180 else "0-180 deg")
-
-# plt.figure(figsize=(10,6))
-# sns.scatterplot(df, x='Days Since Epoch', y='Linear Speed [km/s]', hue='CPA Range')
-# plt.show()
-# plt.close()
-
-
-# plt.figure(figsize=(10,10))
-# sns.heatmap(good_events.corr(), cmap='jet')
-# plt.tight_layout()
-# plt.savefig(os.path.join("Images", "CMEs_corr.png"), dpi=300)
-# plt.show()
-# plt.close()
-
-
-
-plt.figure(figsize=(10,6))
-sns.scatterplot(df, x='Days Since Epoch', y='Linear Speed [km/s]', s=5)
-plt.savefig(os.path.join("Images", "linear_speed.png"), dpi=300)
-plt.close()
-
-plt.figure(figsize=(10,6))
-sns.scatterplot(df, x='Days Since Epoch', y='Angular Width [deg]', s=5)
-plt.savefig(os.path.join("Images", "angular_width.png"), dpi=300)
-plt.close()
-
-
 def get_cme_ranking(row):
     # My custom CME ranking. 
     # 0 = no activity, 1 = minimal activity/poor event. 2 = full event 
@@ -347,7 +252,6 @@ def get_cme_ranking(row):
         return 1
     else:
         return 2
-df['CME Ranking'] = df.apply(get_cme_ranking, axis=1)
 
 # For every pair of decimal values, you want to insert any integer values that 
 # fall strictly between them, and the new rows should have 0 for all other columns.
@@ -403,13 +307,116 @@ def fill_with_nominal_days(df, col):
     # Add last row
     new_rows.append(df.iloc[-1])
     return pd.DataFrame(new_rows).reset_index(drop=True)  
-        
 
-data = fill_with_nominal_days(df, 'Days Since Epoch')
-# data = data[['Days Since Epoch', 'CME Ranking']]
 
-# i =  42000
-# plt.plot(data['Days Since Epoch'].iloc[i:], data['CME Ranking'].iloc[i:], lw=1)
+# =============================================================================
+# ML Model
+# =============================================================================
+if __name__ == "__main__":
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
+    df = load_cdaw_catalog_processed()
+
+
+    # for col in df.drop('Days Since Epoch', axis=1):
+    #     plt.figure()
+    #     plt.title(col)
+    #     plt.scatter(df['Days Since Epoch'], df[col], s=2)
+    #     plt.show()
+
+
+    # sns.scatterplot(df, x='Days Since Epoch', y='Central PA [deg]', hue='Measurement Difficulties')
+
+
+
+    # plt.figure(figsize=(10,6))
+    # sns.scatterplot(good_events, x='Days Since Epoch', y='Angular Width [deg]', hue='Measurement Difficulties')
+    # plt.show()
+    # plt.close()
+
+
+    # plt.figure(figsize=(10,6))
+    # sns.scatterplot(good_events[-100:], x='Days Since Epoch', y='Angular Width [deg]', hue='Measurement Difficulties')
+    # plt.show()
+    # plt.close()
+
+    # plt.figure(figsize=(10,6))
+    # sns.scatterplot(df, x='Days Since Epoch', y='Central PA [deg]', hue='Poor Event')
+    # plt.show()
+    # plt.close()
+
+    df['Mild Event'] = df['Poor Event'] | df['Very Poor Event'] | df['Only C2']
+    df.drop(['Poor Event', 'Very Poor Event', 'Only C2'], axis=1, inplace=True)
+    good_events = df.loc[(df['Mild Event']==0)].drop('Mild Event', axis=1)
+
+    boolean_cols = ['Mild Event', 'Measurement Difficulties']
+    value_cols = ['Central PA [deg]', 'Angular Width [deg]', 'Linear Speed [km/s]',
+           '2nd-order Speed at final height [km/s]',
+           '2nd-order Speed at 20 Rs [km/s]', 'MPA [deg]', 'Days Since Epoch']
+
+    # this_bool = boolean_cols[0]
+    # other_bool = boolean_cols[1]
+    # plt.figure(figsize=(6,6))
+    # sns.pairplot(df.drop(other_bool, axis=1), hue=this_bool, s=4)
+    # plt.savefig(os.path.join("Images", "CMEs_pairplot0.png"), dpi=300)
+    # plt.close()
+
+    # this_bool = boolean_cols[1]
+    # other_bool = boolean_cols[0]
+    # plt.figure(figsize=(8,8))
+    # sns.pairplot(df.drop(other_bool, axis=1), hue=this_bool)
+    # plt.savefig(os.path.join("Images", "CMEs_pairplot1.png"), dpi=300)
+    # plt.close()
+
+
+    # plt.figure(figsize=(6,6))
+    # sns.pairplot(good_events.drop("Measurement Difficulties", axis=1))
+    # plt.savefig(os.path.join("Images", "CMEs_pairplot2.png"), dpi=300)
+    # plt.close()
+
+
+    # plt.figure(figsize=(6,6))
+    # sns.scatterplot(good_events, x='Days Since Epoch', y='Central PA [deg]')
+    # plt.show()
+    # plt.close()
+
+
+    df['CPA Range'] = df['Central PA [deg]'].apply(lambda x: "180-360 deg" if x >180 else "0-180 deg")
+
+    # plt.figure(figsize=(10,6))
+    # sns.scatterplot(df, x='Days Since Epoch', y='Linear Speed [km/s]', hue='CPA Range')
+    # plt.show()
+    # plt.close()
+
+
+    # plt.figure(figsize=(10,10))
+    # sns.heatmap(good_events.corr(), cmap='jet')
+    # plt.tight_layout()
+    # plt.savefig(os.path.join("Images", "CMEs_corr.png"), dpi=300)
+    # plt.show()
+    # plt.close()
+
+
+
+    plt.figure(figsize=(10,6))
+    sns.scatterplot(df, x='Days Since Epoch', y='Linear Speed [km/s]', s=5)
+    plt.savefig(os.path.join("Images", "linear_speed.png"), dpi=300)
+    plt.close()
+
+    plt.figure(figsize=(10,6))
+    sns.scatterplot(df, x='Days Since Epoch', y='Angular Width [deg]', s=5)
+    plt.savefig(os.path.join("Images", "angular_width.png"), dpi=300)
+    plt.close()
+
+
+    df['CME Ranking'] = df.apply(get_cme_ranking, axis=1)
+
+    data = fill_with_nominal_days(df, 'Days Since Epoch')
+    # data = data[['Days Since Epoch', 'CME Ranking']]
+
+    # i =  42000
+    # plt.plot(data['Days Since Epoch'].iloc[i:], data['CME Ranking'].iloc[i:], lw=1)
 
 
-data.to_excel(os.path.join("Data", "CDAW Nominal and Severe Database.xlsx"), index=False)
\ No newline at end of file
+    data.to_excel(os.path.join("Data", "CDAW Nominal and Severe Database.xlsx"), index=False)
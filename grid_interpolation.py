@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vectorized multilinear interpolation on regular (rectilinear) grids.
+
+Shared by the precomputed lookup tables (cutoff rigidity, ...) so that a
+query for N points costs one searchsorted per axis plus 2^D weighted
+gathers, with no Python loop over points.
+"""
+
+import numpy as np
+
+
+def locate(axis, x):
+    """
+    Find the lower cell index and fractional position of x along a sorted axis.
+
+    Points outside the axis are clamped to the first/last cell.
+
+    Returns:
+        (idx, frac): int array of lower indices and float array in [0, 1].
+    """
+    axis = np.asarray(axis, dtype=float)
+    x = np.asarray(x, dtype=float)
+    if axis.size == 1:
+        return np.zeros(x.shape, dtype=np.intp), np.zeros(x.shape)
+    idx = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, axis.size - 2)
+    lo, hi = axis[idx], axis[idx + 1]
+    frac = np.clip((x - lo) / (hi - lo), 0.0, 1.0)
+    return idx, frac
+
+
+def multilinear_interpolate(axes, values, points):
+    """
+    Interpolate `values` defined on the grid `axes` at the given points.
+
+    Parameters:
+        axes (sequence of 1-D arrays): sorted grid coordinates, one per dimension
+        values (ndarray): grid values with shape (len(axes[0]), len(axes[1]), ...)
+        points (sequence of arrays): query coordinates, one array per dimension,
+            all broadcastable to a common shape
+
+    Returns:
+        ndarray of interpolated values with the broadcast shape of `points`.
+    """
+    points = np.broadcast_arrays(*[np.asarray(p, dtype=float) for p in points])
+    shape = points[0].shape
+    located = [locate(axis, p.ravel()) for axis, p in zip(axes, points)]
+
+    out = np.zeros(points[0].size, dtype=np.result_type(values.dtype, np.float32))
+    for corner in range(2 ** len(axes)):
+        weight = np.ones(points[0].size)
+        index = []
+        for d, (idx, frac) in enumerate(located):
+            if (corner >> d) & 1:
+                # Singleton axes have frac == 0, so the clipped index adds nothing.
+                index.append(np.minimum(idx + 1, len(axes[d]) - 1))
+                weight = weight * frac
+            else:
+                index.append(idx)
+                weight = weight * (1.0 - frac)
+        out += weight * values[tuple(index)]
+    return out.reshape(shape)
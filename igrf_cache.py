@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared LRU memoization layer for IGRF field evaluations.
+
+GTF.geomagnetic_latitude and magnetic_field.get_B_field both go through
+`cached_igrf`, so repeating a query (pressing "Compute GTF" again, a
+Streamlit rerun, ...) returns the stored field instead of re-evaluating
+IGRF.
+
+Keys are (lat, lon, alt, decimal year) quantized to a configurable
+tolerance, so queries that differ by less than the tolerance share one
+entry (the field of the first query in that cell is returned). The cache
+holds at most `maxsize` entries and evicts the least recently used one.
+
+Only single-point queries are cached; array queries are bulk work (batch
+GTF, grids) and go straight to IGRF so they do not flush the cache.
+`igrf_batch` is the shared entry point for such array queries.
+
+Field values come from igrf_native, which keeps the parsed coefficient
+file and per-epoch coefficient sets between calls.
+
+Example
+-------
+    from igrf_cache import IGRF_CACHE
+    IGRF_CACHE.configure(maxsize=10000, tolerance=(1e-3, 1e-3, 0.1, 1e-3))
+    print(IGRF_CACHE.cache_info())
+"""
+
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+import igrf_native
+
+# Points are sent to IGRF in chunks of this size; the evaluator builds dense
+# (points x coefficients) Legendre arrays, so unbounded batches blow up memory.
+BATCH_CHUNK_SIZE = 50000
+
+# IGRF is singular exactly at the poles; batch points are clamped just inside.
+POLE_LIMIT = 89.99
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"])
+
+# Quantization steps for (lat [deg], lon [deg], alt [km], decimal year).
+DEFAULT_TOLERANCE = (1e-4, 1e-4, 1e-2, 1e-4)
+DEFAULT_MAXSIZE = 4096
+
+
+def decimal_year(dates):
+    """
+    Decimal year(s) from datetimes, pandas Timestamps, datetime64 values or
+    decimal years (numbers are passed through). Scalars give a float,
+    arrays an array of the same shape.
+    """
+    d = np.asarray(dates)
+    if np.issubdtype(d.dtype, np.number):
+        years = d.astype(float)
+    else:
+        t = d.astype("datetime64[ns]")
+        year = t.astype("datetime64[Y]")
+        start = year.astype("datetime64[ns]")
+        end = (year + 1).astype("datetime64[ns]")
+        years = 1970 + year.astype(np.int64) + (t - start) / (end - start)
+    return float(years) if years.ndim == 0 else years
+
+
+def as_datetime64(dates):
+    """
+    datetime64[ns] value(s) from decimal years or anything numpy converts to
+    datetime64 (datetimes, Timestamps, strings). Keeps the input shape.
+    """
+    d = np.asarray(dates)
+    if not np.issubdtype(d.dtype, np.number):
+        return d.astype("datetime64[ns]")
+    years = d.astype(float)
+    whole = np.floor(years)
+    start = (whole - 1970).astype(np.int64).astype("datetime64[Y]").astype("datetime64[ns]")
+    end = (whole - 1969).astype(np.int64).astype("datetime64[Y]").astype("datetime64[ns]")
+    offset = ((end - start).astype(np.int64) * (years - whole)).astype(np.int64)
+    return start + offset.astype("timedelta64[ns]")
+
+
+def as_datetime(date):
+    """Single date as a datetime for ppigrf; decimal years and datetime64 are converted."""
+    if isinstance(date, np.ndarray) and date.size == 1:
+        date = date.ravel()[0]
+    if isinstance(date, (int, float, np.number, np.datetime64)):
+        return as_datetime64(date).astype("datetime64[us]").item()
+    return date
+
+
+class IGRFCache:
+    """Size-bounded, thread-safe LRU cache of IGRF (Be, Bn, Bu) results."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, tolerance=DEFAULT_TOLERANCE):
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self.maxsize = maxsize
+        self.tolerance = tuple(tolerance)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configure(self, maxsize=None, tolerance=None):
+        """Change size and/or quantization; changing the tolerance clears the cache."""
+        with self._lock:
+            if tolerance is not None and tuple(tolerance) != self.tolerance:
+                self.tolerance = tuple(tolerance)
+                self._data.clear()
+            if maxsize is not None:
+                self.maxsize = maxsize
+                self._evict()
+
+    def key(self, lat, lon, alt_km, date):
+        """Quantized cache key for one query point."""
+        values = (float(lat), float(lon) % 360.0, float(alt_km),
+                  float(np.ravel(decimal_year(date))[0]))
+        return tuple(int(round(v / step)) for v, step in zip(values, self.tolerance))
+
+    def igrf(self, lon, lat, alt_km, date):
+        """Drop-in for ppigrf.igrf (same argument order and output shapes)."""
+        if np.size(lon) != 1 or np.size(lat) != 1 or np.size(alt_km) != 1 or np.size(date) != 1:
+            return igrf_native.igrf(lon, lat, alt_km, date)
+
+        key = self.key(np.ravel(lat)[0], np.ravel(lon)[0], np.ravel(alt_km)[0], date)
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return tuple(b.copy() for b in self._data[key])
+            self.misses += 1
+
+        result = tuple(np.asarray(b) for b in igrf_native.igrf(lon, lat, alt_km, date))
+
+        with self._lock:
+            self._data[key] = result
+            self._data.move_to_end(key)
+            self._evict()
+        return tuple(b.copy() for b in result)
+
+    def _evict(self):
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def cache_info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._data))
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+# Shared instance used by GTF and magnetic_field.
+IGRF_CACHE = IGRFCache()
+
+
+def cached_igrf(lon, lat, alt_km, date):
+    """IGRF (same call as ppigrf.igrf) through the shared cache."""
+    return IGRF_CACHE.igrf(lon, lat, alt_km, date)
+
+
+def igrf_batch(lat, lon, alt_km, dates, epoch_resolution="D"):
+    """
+    IGRF (Be, Bn, Bu) [nT] for arrays of positions and per-point times.
+
+    IGRF evaluates every coordinate at every date it is given, so points
+    are grouped by epoch (rounded to `epoch_resolution`, a numpy datetime64
+    unit such as "D" or "h"; IGRF secular variation over a day is a few nT)
+    and each group is evaluated with one broadcasted call per chunk.
+
+    dates may be datetimes, datetime64 values or decimal years.
+
+    Returns:
+        (Be, Bn, Bu) arrays with the broadcast shape of the inputs.
+    """
+    lat, lon, alt_km, dates = np.broadcast_arrays(
+        np.asarray(lat, dtype=float), np.asarray(lon, dtype=float),
+        np.asarray(alt_km, dtype=float), as_datetime64(dates))
+    shape = lat.shape
+    lat = np.clip(lat.ravel(), -POLE_LIMIT, POLE_LIMIT)
+    lon, alt_km = lon.ravel(), alt_km.ravel()
+    epochs, inverse = np.unique(dates.ravel().astype(f"datetime64[{epoch_resolution}]"),
+                                return_inverse=True)
+    inverse = inverse.ravel()
+
+    B = np.empty((3, lat.size))
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.concatenate(([0], np.cumsum(np.bincount(inverse, minlength=len(epochs)))))
+    for i, epoch in enumerate(epochs):
+        group = order[bounds[i]:bounds[i + 1]]
+        for start in range(0, group.size, BATCH_CHUNK_SIZE):
+            idx = group[start:start + BATCH_CHUNK_SIZE]
+            Be, Bn, Bu = igrf_native.igrf(lon[idx], lat[idx], alt_km[idx], epoch)
+            B[:, idx] = Be[0], Bn[0], Bu[0]
+    return B[0].reshape(shape), B[1].reshape(shape), B[2].reshape(shape)
+
+
+if __name__ == "__main__":
+    # Regression check: batch and single-point paths must agree for every
+    # accepted date form, including decimal years.
+    from datetime import datetime
+
+    lat, lon, alt = 40.0, -105.3, 1.6  # Boulder, CO
+    reference = np.array(cached_igrf(lon, lat, alt, datetime(2025, 7, 2, 12))).ravel()
+    for date in (2025.5, np.array([2025.5]), np.datetime64("2025-07-02T12:00"),
+                 datetime(2025, 7, 2, 12)):
+        batch = np.array(igrf_batch(lat, lon, alt, date, epoch_resolution="h")).ravel()
+        scalar = np.array(cached_igrf(lon, lat, alt, date)).ravel()
+        assert np.allclose(batch, reference) and np.allclose(scalar, reference), date
+    print("igrf_batch matches cached_igrf for decimal-year and datetime inputs")
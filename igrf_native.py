@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+In-project IGRF evaluator with per-epoch coefficient precompute.
+
+ppigrf re-reads the .shc coefficient file, interpolates the Gauss
+coefficients to the requested date and rebuilds the Schmidt normalization
+on every call (~20 ms before any point is evaluated). This module does
+that setup once:
+
+- the coefficient file is parsed once per process (ppigrf.ppigrf.read_shc)
+- the Schmidt factors and recurrence constants are computed once
+- interpolated (g, h) sets are kept per epoch in a small LRU, since most
+  queries share a single epoch
+
+Legendre functions are then evaluated for all points at once with the
+same Schmidt semi-normalized recurrence as ppigrf, so results agree with
+ppigrf to round-off. `igrf` and `igrf_gc` take the same arguments and
+return the same shapes as their ppigrf counterparts.
+
+Dates outside the coefficient file are clamped to its first/last epoch.
+
+Example
+-------
+    from igrf_native import igrf
+    Be, Bn, Bu = igrf(lon, lat, alt_km, datetime(2025, 11, 9))
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Module imports (not "from ... import"): igrf_cache imports this module too.
+import coordinates
+import igrf_cache
+
+RE_KM = 6371.2             # IGRF reference radius [km]
+CHUNK_SIZE = 50000         # points per (points x coefficients) block
+EPOCH_CACHE_SIZE = 256
+
+
+class IGRFModel:
+    """
+    Gauss coefficients of one .shc file with cached per-epoch sets.
+
+    Parameters:
+        coeff_fn (str, optional): .shc coefficient file, default ppigrf's latest IGRF
+    """
+
+    def __init__(self, coeff_fn=None):
+        # ppigrf (and pandas with it) is imported only when coefficients are read
+        import ppigrf
+
+        coeff_fn = coeff_fn or ppigrf.ppigrf.shc_fn
+        g, h = ppigrf.ppigrf.read_shc(coeff_fn)
+        self.coeff_fn = coeff_fn
+        self.times = g.index.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        self.g = g.to_numpy(dtype=float)
+        self.h = h.to_numpy(dtype=float)
+        self.n, self.m = (np.array(k) for k in zip(*g.columns))
+        self.nmax = int(self.n.max())
+
+        # Schmidt semi-normalization and the recurrence constant K(n, m)
+        nmax = self.nmax
+        S = np.zeros((nmax + 1, nmax + 1))
+        K = np.zeros((nmax + 1, nmax + 1))
+        S[0, 0] = 1.0
+        for n in range(1, nmax + 1):
+            for m in range(n + 1):
+                if m == 0:
+                    S[n, 0] = S[n - 1, 0] * (2.0 * n - 1) / n
+                else:
+                    S[n, m] = S[n, m - 1] * np.sqrt((n - m + 1) * (int(m == 1) + 1.0) / (n + m))
+                if n > 1 and m < n:
+                    K[n, m] = ((n - 1)**2 - m**2) / ((2 * n - 1) * (2 * n - 3))
+        self.schmidt = S[self.n, self.m]
+        self._K = K
+
+        self._lock = threading.Lock()
+        self._epochs = OrderedDict()
+
+    def coefficients(self, date):
+        """(g, h) interpolated linearly in time to `date`, cached per epoch."""
+        t = int(igrf_cache.as_datetime64(date).astype(np.int64))
+        with self._lock:
+            if t in self._epochs:
+                self._epochs.move_to_end(t)
+                return self._epochs[t]
+
+        tc = np.clip(t, self.times[0], self.times[-1])
+        i = int(np.clip(np.searchsorted(self.times, tc, side="right") - 1, 0, len(self.times) - 2))
+        w = (tc - self.times[i]) / (self.times[i + 1] - self.times[i])
+        coeffs = ((1 - w) * self.g[i] + w * self.g[i + 1],
+                  (1 - w) * self.h[i] + w * self.h[i + 1])
+
+        with self._lock:
+            self._epochs[t] = coeffs
+            while len(self._epochs) > EPOCH_CACHE_SIZE:
+                self._epochs.popitem(last=False)
+        return coeffs
+
+    def legendre(self, theta, max_degree=None):
+        """
+        Schmidt semi-normalized P(n, m) and dP/dθ for colatitudes θ [deg].
+
+        Returns:
+            (P, dP) arrays of shape (points, coefficients), restricted to
+            degrees <= max_degree when given
+        """
+        theta_rad = np.radians(np.ravel(theta))
+        sinth, costh = np.sin(theta_rad), np.cos(theta_rad)
+        nmax = self.nmax if max_degree is None else min(int(max_degree), self.nmax)
+        cols = self._columns(max_degree)
+        P = np.zeros((nmax + 1, nmax + 1, theta_rad.size))
+        dP = np.zeros_like(P)
+        P[0, 0] = 1.0
+        for n in range(1, nmax + 1):
+            P[n, n] = sinth * P[n - 1, n - 1]
+            dP[n, n] = sinth * dP[n - 1, n - 1] + costh * P[n - 1, n - 1]
+            # All orders m < n of degree n at once
+            P[n, :n] = costh * P[n - 1, :n] - self._K[n, :n, np.newaxis] * P[n - 2, :n]
+            dP[n, :n] = (costh * dP[n - 1, :n] - sinth * P[n - 1, :n]
+                         - self._K[n, :n, np.newaxis] * dP[n - 2, :n])
+        n_idx, m_idx = self.n[cols], self.m[cols]
+        return (P[n_idx, m_idx].T * self.schmidt[cols]), (dP[n_idx, m_idx].T * self.schmidt[cols])
+
+    def _columns(self, max_degree=None):
+        """Slice of the coefficient columns with degree <= max_degree (columns are sorted by degree)."""
+        if max_degree is None:
+            return slice(None)
+        return slice(0, int(np.count_nonzero(self.n <= max_degree)))
+
+    def field_gc(self, r, theta, phi, date, max_degree=None):
+        """
+        (Br, Btheta, Bphi) [nT] at geocentric r [km], colatitude and
+        longitude [deg] for one date; flat arrays of the broadcast size.
+        """
+        cols = self._columns(max_degree)
+        g, h = self.coefficients(date)
+        g, h, n, m = g[cols], h[cols], self.n[cols], self.m[cols]
+        r, theta, phi = (a.ravel() for a in np.broadcast_arrays(
+            np.asarray(r, dtype=float), np.asarray(theta, dtype=float), np.asarray(phi, dtype=float)))
+
+        Br, Btheta, Bphi = (np.empty(r.size) for _ in range(3))
+        for start in range(0, r.size, CHUNK_SIZE):
+            sl = slice(start, start + CHUNK_SIZE)
+            P, dP = self.legendre(theta[sl], max_degree)
+            ratio = (RE_KM / r[sl])[:, np.newaxis]
+            rn = ratio ** (np.arange(self.nmax + 1) + 2)          # (a/r)^(n+2) per degree
+            rn = rn[:, n]
+            mphi = np.radians(phi[sl])[:, np.newaxis] * m
+            cos_mphi, sin_mphi = np.cos(mphi), np.sin(mphi)
+            gh = g * cos_mphi + h * sin_mphi
+            hg = h * cos_mphi - g * sin_mphi
+
+            Br[sl] = np.einsum("ij,ij->i", rn * (n + 1) * P, gh)
+            Btheta[sl] = -np.einsum("ij,ij->i", rn * dP, gh)
+            Bphi[sl] = -np.einsum("ij,ij->i", rn * m * P, hg) / np.sin(np.radians(theta[sl]))
+        return Br, Btheta, Bphi
+
+
+_MODELS = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def get_model(coeff_fn=None):
+    """Shared IGRFModel for a coefficient file (None: ppigrf's latest IGRF), parsed once per process."""
+    with _MODELS_LOCK:
+        if coeff_fn not in _MODELS:
+            _MODELS[coeff_fn] = IGRFModel(coeff_fn)
+        return _MODELS[coeff_fn]
+
+
+def _dates(date):
+    """Dates as a list, with ppigrf's rule that a non-iterable is one date."""
+    if isinstance(date, (str, bytes)) or not hasattr(date, "__iter__"):
+        return [date]
+    return list(np.ravel(np.asarray(date, dtype=object)))
+
+
+def igrf_gc(r, theta, phi, date, coeff_fn=None, max_degree=None):
+    """
+    Drop-in for ppigrf.igrf_gc: geocentric (Br, Btheta, Bphi) [nT], each of
+    shape (n_dates, *broadcast shape of r, theta, phi).
+    """
+    model = get_model(coeff_fn)
+    shape = np.broadcast(np.asarray(r), np.asarray(theta), np.asarray(phi)).shape
+    out = [model.field_gc(r, theta, phi, d, max_degree) for d in _dates(date)]
+    return tuple(np.stack([o[i] for o in out]).reshape((len(out),) + shape) for i in range(3))
+
+
+def igrf(lon, lat, h, date, coeff_fn=None, max_degree=None):
+    """
+    Drop-in for ppigrf.igrf: geodetic (Be, Bn, Bu) [nT], each of shape
+    (n_dates, *broadcast shape of lon, lat, h).
+    """
+    lon, lat, h = np.broadcast_arrays(np.asarray(lon, dtype=float),
+                                      np.asarray(lat, dtype=float), np.asarray(h, dtype=float))
+    shape = lon.shape
+    lon, lat, h = lon.ravel(), lat.ravel(), h.ravel()
+    r, theta = coordinates.geodetic_to_geocentric(lat, h)
+
+    model = get_model(coeff_fn)
+    Be, Bn, Bu = [], [], []
+    for d in _dates(date):
+        Br, Btheta, Bphi = model.field_gc(r, theta, lon, d, max_degree)
+        bn, bu = coordinates.geocentric_to_geodetic_vector(lat, theta, Btheta, Br)
+        Be.append(Bphi)
+        Bn.append(bn)
+        Bu.append(bu)
+    outshape = (len(Be),) + shape
+    return (np.stack(Be).reshape(outshape), np.stack(Bn).reshape(outshape),
+            np.stack(Bu).reshape(outshape))
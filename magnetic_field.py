@@ -7,10 +7,12 @@ Created on Sun Nov  9 05:18:00 2025
 """
 
 import numpy as np
-from scipy.integrate import solve_ivp
 from datetime import datetime
-import ppigrf # or PyGeopack for better accuracy in complex environments
-import pandas as pd
+
+import igrf_native
+from coordinates import ecef_to_geodetic, ecef_to_spherical, enu_to_ecef, spherical_to_ecef_vector
+from field_tiers import tiered_igrf
+from igrf_cache import POLE_LIMIT, as_datetime64, cached_igrf, decimal_year, igrf_batch
 
 
 # def decimal_year(dt):
@@ -22,19 +24,12 @@ import pandas as pd
 
 def to_decimal_year(dt):
     """Convert datetime or pandas Timestamp to decimal year float."""
-    if not isinstance(dt, datetime):
-        dt = pd.to_datetime(dt)  # if user passed string or Timestamp
-
-    year_start = datetime(dt.year, 1, 1)
-    year_end = datetime(dt.year + 1, 1, 1)
-    return dt.year + ((dt - year_start).total_seconds() /
-                      (year_end - year_start).total_seconds())
-
+    return decimal_year(dt)
 
 
 # Function to calculate magnetic field (using IGRF as example)
 
-def get_B_field(lat, lon, alt, date):
+def get_B_field(lat, lon, alt, date, tolerance=None):
     """
     Compute the Earth's magnetic field vector using IGRF.
 
@@ -43,6 +38,9 @@ def get_B_field(lat, lon, alt, date):
         lon (float): Geodetic longitude [deg]
         alt (float): Altitude above mean sea level [km]
         date (float): Decimal year (e.g., 2025.85)
+        tolerance (float, optional): acceptable field error [nT]; the
+            cheapest field_tiers tier (dipole, truncated IGRF, full IGRF)
+            whose error bound meets it is used
 
     Returns:
         dict: {
@@ -53,9 +51,13 @@ def get_B_field(lat, lon, alt, date):
             "declination": float,  # magnetic declination [deg, east of north]
             "inclination": float   # magnetic inclination [deg, positive down]
         }
+        With `tolerance`, also "tier" (tier used) and "error_bound" [nT].
     """
     # --- Compute local magnetic field components (East, North, Up) in nT ---
-    Be, Bn, Bu = ppigrf.igrf(lon, lat, alt, date)
+    if tolerance is None:
+        Be, Bn, Bu = cached_igrf(lon, lat, alt, date)
+    else:
+        Be, Bn, Bu, tier, bound = tiered_igrf(lon, lat, alt, date, tolerance)
 
     # --- Convert nT -> Tesla ---
     Be_T = Be * 1e-9
@@ -72,15 +74,9 @@ def get_B_field(lat, lon, alt, date):
     inclination = np.degrees(np.arctan2(Bu_T, np.sqrt(Be_T**2 + Bn_T**2)))
 
     # --- Convert to Earth-Centered Earth-Fixed (ECEF) Cartesian components ---
-    lat_rad = np.radians(lat)
-    lon_rad = np.radians(lon)
-
-    # Convert from local ENU (Be, Bn, Bu) to ECEF (Bx, By, Bz)
-    Bx = -np.sin(lat_rad)*np.cos(lon_rad)*Bn_T - np.sin(lon_rad)*Be_T + np.cos(lat_rad)*np.cos(lon_rad)*Bu_T
-    By = -np.sin(lat_rad)*np.sin(lon_rad)*Bn_T + np.cos(lon_rad)*Be_T + np.cos(lat_rad)*np.sin(lon_rad)*Bu_T
-    Bz = np.cos(lat_rad)*Bn_T + np.sin(lat_rad)*Bu_T
+    Bx, By, Bz = enu_to_ecef(lat, lon, Be_T, Bn_T, Bu_T)
 
-    return {
+    result = {
         "Bx": Bx,
         "By": By,
         "Bz": Bz,
@@ -88,22 +84,239 @@ def get_B_field(lat, lon, alt, date):
         "declination": declination,
         "inclination": inclination
     }
+    if tolerance is not None:
+        result["tier"] = tier.item() if tier.ndim == 0 else tier
+        result["error_bound"] = bound.item() if bound.ndim == 0 else bound
+    return result
+
+
+def get_B_field_batch(lat, lon, alt, dates, dtype=np.float64, epoch_resolution="D"):
+    """
+    Array-native get_B_field for N positions and times.
+
+    Parameters:
+        lat, lon (array_like): Geodetic latitude / longitude [deg]
+        alt (array_like): Altitude above mean sea level [km]
+        dates: datetimes / datetime64 values / decimal years, one per point or a single date
+        dtype: np.float64 (default) or np.float32 for the returned arrays
+        epoch_resolution (str): IGRF epoch grouping, see igrf_cache.igrf_batch
+
+    Returns:
+        dict with arrays of the inputs' broadcast shape S: {
+            "B_ecef": S + (3,) array,  # ECEF X, Y, Z components [T]
+            "B_total": S array,        # total field magnitude [T]
+            "declination": S array,    # [deg, east of north]
+            "inclination": S array     # [deg, positive down]
+        }
+    """
+    lat, lon, alt, dates = np.broadcast_arrays(
+        np.asarray(lat, dtype=float), np.asarray(lon, dtype=float),
+        np.asarray(alt, dtype=float), as_datetime64(dates))
+    shape = lat.shape
+    lat, lon, alt, dates = (x.ravel() for x in (lat, lon, alt, dates))
+    # Same pole clamp as igrf_batch, so the ENU frame matches the field it rotates
+    lat = np.clip(lat, -POLE_LIMIT, POLE_LIMIT)
+
+    # --- Local ENU components, nT -> Tesla ---
+    Be, Bn, Bu = ((b.ravel() * 1e-9).astype(dtype)
+                  for b in igrf_batch(lat, lon, alt, dates, epoch_resolution))
+
+    B_h = np.hypot(Be, Bn)
+    B_ecef = np.empty((lat.size, 3), dtype=dtype)
+    B_ecef[:, 0], B_ecef[:, 1], B_ecef[:, 2] = enu_to_ecef(lat, lon, Be, Bn, Bu, dtype)
+
+    return {
+        "B_ecef": B_ecef.reshape(shape + (3,)),
+        "B_total": np.hypot(B_h, Bu).reshape(shape),
+        "declination": np.degrees(np.arctan2(Be, Bn)).reshape(shape),
+        "inclination": np.degrees(np.arctan2(Bu, B_h)).reshape(shape),
+    }
+
+
+# ---------------------------------------------------
+# Charged-particle tracing
+# ---------------------------------------------------
+R_E_KM = 6371.2             # IGRF reference radius [km]
+C_LIGHT = 299792458.0       # speed of light [m/s]
+E_CHARGE = 1.602176634e-19  # elementary charge [C]
+M_PROTON = 1.67262192e-27   # proton rest mass [kg]
+
+# Termination codes returned by trace_particles
+RUNNING, ESCAPED, ATMOSPHERE, TIMEOUT, FAILED = 0, 1, 2, 3, 4
+
+
+def field_ecef_cartesian(xyz, date, max_degree=None):
+    """
+    IGRF field [T] at ECEF Cartesian positions in one batched evaluation.
+
+    Parameters:
+        xyz (array): (N, 3) ECEF positions [m]
+        date: datetime, datetime64 or decimal year of the field model
+        max_degree (int, optional): truncate the expansion at this degree
+
+    Returns:
+        (N, 3) array of ECEF field components [T]
+    """
+    xyz = np.atleast_2d(xyz) * 1e-3
+    r, theta, phi = ecef_to_spherical(xyz[:, 0], xyz[:, 1], xyz[:, 2])
+    # Kept off the poles where IGRF returns NaN
+    theta = np.clip(theta, 90.0 - POLE_LIMIT, 90.0 + POLE_LIMIT)
+
+    # IGRF takes geocentric spherical coordinates directly, so no geodetic
+    # conversion is needed on the tracing hot path.
+    Br, Btheta, Bphi = igrf_native.igrf_gc(r, theta, phi, date, max_degree=max_degree)
+    B = np.empty(xyz.shape)
+    B[:, 0], B[:, 1], B[:, 2] = spherical_to_ecef_vector(theta, phi, Br[0], Btheta[0], Bphi[0])
+    return B * 1e-9
+
+
+def rigidity_to_speed(rigidity_gv, charge, mass):
+    """Particle speed [m/s] for a rigidity R = pc/q [GV], charge [C] and rest mass [kg]."""
+    p = np.asarray(rigidity_gv, dtype=float) * 1e9 * np.abs(charge) / C_LIGHT  # momentum [kg m/s]
+    return p / np.sqrt(mass**2 + (p / C_LIGHT)**2)
+
+
+def lorentz_factor(v):
+    """Lorentz factor γ for (N, 3) velocities [m/s]."""
+    beta2 = np.einsum("ij,ij->i", v, v) / C_LIGHT**2
+    return 1.0 / np.sqrt(1.0 - beta2)
+
+
+def lorentz_derivatives(state, charge, mass, date, gamma=None):
+    """
+    Time derivatives of a (particles × 6) state array under the Lorentz force.
+
+    state columns are ECEF [x, y, z, vx, vy, vz] in m and m/s. With E = 0
+    the Lorentz factor is constant and dv/dt = q/(γ m) (v × B); pass
+    `gamma` (from the initial speed) when integrating, since intermediate
+    stages of a general ODE solver need not keep |v| below c. The field is
+    evaluated for all particles at once.
+    """
+    state = np.atleast_2d(state)
+    v = state[:, 3:]
+    if gamma is None:
+        gamma = lorentz_factor(v)
+    B = field_ecef_cartesian(state[:, :3], date)
+    q_over_m = np.asarray(charge) / (gamma * np.asarray(mass))
+    dstate = np.empty_like(state)
+    dstate[:, :3] = v
+    dstate[:, 3:] = q_over_m[..., np.newaxis] * np.cross(v, B)
+    return dstate
 
 
 # Function to solve the equation of motion for a charged particle (Lorentz force)
-def particle_trajectory(t, state, charge, mass, date):
-    # state = [x, y, z, vx, vy, vz]
-    x, y, z, vx, vy, vz = state
-    lat, lon, alt = ... # convert cartesian to geodetic for B field model input
-    decimal_yr = to_decimal_year(date)
-    Bx, By, Bz = get_B_field(lat, lon, alt, decimal_yr)
-    
-    # Lorentz force F = q(E + v x B) - assuming E=0 for this simplified model
-    # a = F/m = (q/m) * (v x B)
-    # dv/dt = (charge/mass) * np.cross([vx, vy, vz], [Bx, By, Bz])
-    ax, ay, az = ... # calculate components
-    
-    return [vx, vy, vz, ax, ay, az]
+def particle_trajectory(t, state, charge, mass, date, gamma=None):
+    """
+    Right-hand side for a single particle, e.g. for scipy's solve_ivp:
+
+        solve_ivp(particle_trajectory, (0, t_max), state0,
+                  args=(charge, mass, date, gamma0))
+
+    state = [x, y, z, vx, vy, vz] in ECEF m and m/s; gamma0 is the Lorentz
+    factor of the initial speed. For many particles use trace_particles.
+    """
+    return list(lorentz_derivatives(np.asarray(state, dtype=float), charge, mass, date, gamma)[0])
+
+
+def trace_particles(r0, v0, charge, mass, date, t_max, dt=None, gyro_fraction=0.02,
+                    max_step=None, min_alt_km=20.0, escape_radius_re=10.0,
+                    max_steps=200000, record_every=None):
+    """
+    Integrate many charged particles at once with a vectorized Boris pusher.
+
+    Each step is drift / rotate / drift: positions move half a step, the
+    velocities of all particles still in flight are rotated about the field
+    from one batched IGRF evaluation, and positions move the second half.
+    The rotation keeps |v| (and so γ) constant, which matters for
+    relativistic cosmic-ray protons; speeds are also renormalised each step
+    against round-off. With dt=None each particle takes its own step of
+    `gyro_fraction` of its local gyro-period (from the previous step's
+    field); otherwise all particles use the fixed step dt.
+
+    Parameters:
+        r0, v0 (array): (N, 3) ECEF positions [m] and velocities [m/s]
+        charge, mass: particle charge [C] and rest mass [kg] (scalars or (N,))
+        date: datetime, datetime64 or decimal year of the field model
+        t_max (float): maximum flight time per particle [s]
+        dt (float, optional): fixed time step [s]
+        gyro_fraction (float): adaptive step as a fraction of the gyro-period
+        max_step (float, optional): upper bound on adaptive steps [s]
+        min_alt_km (float): particles below this geodetic altitude stop (ATMOSPHERE)
+        escape_radius_re (float): particles beyond this radius [R_E] stop (ESCAPED)
+        max_steps (int): safety limit on integration steps (then TIMEOUT)
+        record_every (int, optional): store positions every n steps
+
+    Returns:
+        dict with "state" (N, 6) final states, "t" (N,) flight times,
+        "status" (N,) codes ESCAPED / ATMOSPHERE / TIMEOUT / FAILED (non-finite
+        state or field), "steps" and, with record_every, "path" (list of
+        (N, 3) position snapshots; NaN for stopped particles).
+    """
+    r = np.array(np.atleast_2d(r0), dtype=float)
+    v = np.array(np.atleast_2d(v0), dtype=float)
+    n = r.shape[0]
+    charge = np.broadcast_to(np.asarray(charge, dtype=float), (n,))
+    mass = np.broadcast_to(np.asarray(mass, dtype=float), (n,))
+    speed = np.linalg.norm(v, axis=1)
+    q_over_gm = charge / (lorentz_factor(v) * mass)
+    t = np.zeros(n)
+    status = np.full(n, RUNNING)
+    r_max = escape_radius_re * R_E_KM * 1e3
+    path = [] if record_every else None
+    B_mag = np.linalg.norm(field_ecef_cartesian(r, date), axis=1) if dt is None else None
+
+    steps = 0
+    while steps < max_steps:
+        active = np.flatnonzero(status == RUNNING)
+        if active.size == 0:
+            break
+        qgm = q_over_gm[active]
+
+        if dt is None:
+            h = gyro_fraction * 2 * np.pi / (np.abs(qgm) * B_mag[active])
+            if max_step is not None:
+                h = np.minimum(h, max_step)
+        else:
+            h = np.full(active.size, float(dt))
+        h = np.minimum(h, t_max - t[active])
+        bad = ~np.isfinite(h)  # e.g. no field at the particle position
+        if bad.any():
+            status[active[bad]] = FAILED
+            active, qgm, h = active[~bad], qgm[~bad], h[~bad]
+
+        # Drift half a step, rotate v about B at the midpoint, drift again
+        r_half = r[active] + 0.5 * h[:, np.newaxis] * v[active]
+        B = field_ecef_cartesian(r_half, date)
+        tvec = (0.5 * qgm * h)[:, np.newaxis] * B
+        svec = 2 * tvec / (1 + np.einsum("ij,ij->i", tvec, tvec))[:, np.newaxis]
+        v_prime = v[active] + np.cross(v[active], tvec)
+        v_new = v[active] + np.cross(v_prime, svec)
+        v_new *= (speed[active] / np.linalg.norm(v_new, axis=1))[:, np.newaxis]
+        r[active] = r_half + 0.5 * h[:, np.newaxis] * v_new
+        v[active] = v_new
+        t[active] += h
+        if dt is None:
+            B_mag[active] = np.linalg.norm(B, axis=1)
+        steps += 1
+
+        radius = np.linalg.norm(r[active], axis=1)
+        _, _, alt_km = ecef_to_geodetic(*(r[active] * 1e-3).T)
+        finite = np.isfinite(radius) & np.all(np.isfinite(v[active]), axis=1)
+        status[active[alt_km <= min_alt_km]] = ATMOSPHERE
+        status[active[radius >= r_max]] = ESCAPED
+        status[active[(status[active] == RUNNING) & (t[active] >= t_max)]] = TIMEOUT
+        status[active[~finite]] = FAILED
+
+        if record_every and steps % record_every == 0:
+            snapshot = np.full((n, 3), np.nan)
+            snapshot[active] = r[active]
+            path.append(snapshot)
+
+    status[status == RUNNING] = TIMEOUT
+    result = {"state": np.hstack([r, v]), "t": t, "status": status, "steps": steps}
+    if record_every:
+        result["path"] = path
+    return result
 
 
 if __name__ == "__main__":
@@ -6,21 +6,18 @@ Created on Sun Nov 30 18:52:40 2025
 """
 import os 
 import numpy as np
-import tkinter as tk
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-import matplotlib.pyplot as plt
-from mpl_toolkits.basemap import Basemap
 import pandas as pd
-import xarray as xr
-from matplotlib.colors import LogNorm
-from matplotlib.patches import Circle
+
+# Plotting, Tk and netCDF imports live in the functions that need them, so
+# importing this module has no GUI side effects.
 
 def create_map_plot(fig, grid_density):
     """
     Create a world map heatmap (scatter plot) using Basemap
     and draw it on the provided Matplotlib figure.
     """
+    from matplotlib.colors import LogNorm
+    from mpl_toolkits.basemap import Basemap
 
     # Add subplot to the provided figure
     ax = fig.add_subplot(111)
@@ -78,6 +75,10 @@ def create_map_plot(fig, grid_density):
 
 def map_window_2D(grid_density):
     """Create a Tkinter popup window containing the world heatmap."""
+    import tkinter as tk
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
     root = tk.Tk()
     root.title("World Heatmap Viewer")
 
@@ -99,6 +100,10 @@ def map_window_2D(grid_density):
     
 def map_window_polar(grid_density, vmax):
     """Create a Tkinter popup window containing the world heatmap."""
+    import tkinter as tk
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+
     root = tk.Tk()
     root.title("World Heatmap Viewer")
 
@@ -133,6 +138,9 @@ def convert_lon(lon):
 
 
 def read_nc(file):
+    import matplotlib.pyplot as plt
+    import xarray as xr
+
     # Load the netCDF file using xarray
     ds = xr.open_dataset(file)
     
@@ -151,6 +159,10 @@ def read_nc(file):
     return ds
 
 def polar_map_grid(grid, vmax):
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+    from matplotlib.patches import Circle
+
     # Assumptions:
     # grid has columns: longitude, latitude, value
     # longitude in degrees (0–360 or –180–180)
@@ -222,97 +234,99 @@ def polar_map_grid(grid, vmax):
     plt.show()
     
 
-# swpc_wsaenlil_bkg_20251004_0000
-yr = 2025
-mo = 10
-da = 4
-
-data_file = os.path.join("Data", "swpc_wsaenlil_bkg_20251004_0000", "wsa_enlil.mrid00000000.suball.nc") # BG#data_file = os.path.join("Data", "swpc_wsaenlil_cme_20251003_1036", "wsa_enlil.mrid00057579.suball.nc") # CME
-if os.path.exists(data_file):
-    ds = read_nc(data_file)
-else:
-    print("Data file does not exist:", data_file)
-
-# data_path = os.path.join("Data", f"swpc_wsaenlil_bkg_{yr:02d}{mo:02d}{da:02d}_0000")
-# if os.path.exists(data_path):
-#     data_file = os.path.join(data_path, "wsa_enlil.mrid00000000.suball.nc")
-#     if os.path.exists(data_file):
-#         # Open .nc data file.
-#         ds = read_nc(data_file)
-        
-#     else:
-#         print("Data file does not exist:", data_file)
-# else:
-#     print("Data path does not exist:", data_path)
-    
-    
-radial_position_m = np.array(ds['x_coord']) # m
-colatitudes_rad = np.array(ds['y_coord']) # radians
-longitudes_rad = np.array(ds['z_coord']) # radians 
-
-# Convert to desired units.
-R_e = 6371 # radius of Earth in km
-radial_position_km = radial_position_m / 1000
-altitudes_km = radial_position_km - R_e
-colatitudes_deg = colatitudes_rad * 180/np.pi
-latitudes_deg = 90 - colatitudes_deg
-longitudes_deg = longitudes_rad * 180/np.pi
-
-# =============================================================================
-# 2D World Map
-# =============================================================================
-# vals = np.array(ds['dd23_3d'])
-# vals.shape # time, lon, colat
-
-# longitudes_ls = []
-# latitudes_ls = []
-# density_ls = []
-# for lo, lon in enumerate(longitudes_deg):
-#     for la, lat in enumerate(latitudes_deg):
-#         longitudes_ls.append(convert_lon(lon))
-#         latitudes_ls.append(lat)
-#         density_ls.append(vals[0,lo,la])
-
-# grid_density = pd.DataFrame()
-# grid_density['Lat'] = latitudes_ls
-# grid_density['Lon'] = longitudes_ls
-# #grid_density['Alt'] = altitudes_km
-# grid_density['Plasma Density'] = density_ls
-
-# describe_grid(grid_density)
-
-# map_window_2D(grid_density)
-
-
-# =============================================================================
-# 3D Polar Map
-# =============================================================================
-var = 'pp13_3d'
-vals = np.array(ds[var])
-vals.shape # uncalibrated plasma density in rad-colat-time, longitude zero
-#units = ds[var].attrs['units']
-
-t=136
-longitudes_ls = []
-altitudes_ls = []
-#latitudes_ls = []
-density_ls = []
-for a, alt in enumerate(altitudes_km):
-    for lo, lon in enumerate(longitudes_deg):
-        altitudes_ls.append(alt)
-        longitudes_ls.append(convert_lon(lon))
-        density_ls.append(vals[t,lo,a])
-
-grid_density = pd.DataFrame()
-grid_density['Lon'] = longitudes_ls
-grid_density['Alt'] = altitudes_ls
-grid_density['Plasma Density'] = density_ls
-
-# describe_grid(grid_density)
-# map_window_polar(grid_density)
-
-polar_map_grid(grid_density, np.max(vals))
-
-
-
-
+def main():
+    # swpc_wsaenlil_bkg_20251004_0000
+    yr = 2025
+    mo = 10
+    da = 4
+
+    data_file = os.path.join("Data", "swpc_wsaenlil_bkg_20251004_0000", "wsa_enlil.mrid00000000.suball.nc") # BG#data_file = os.path.join("Data", "swpc_wsaenlil_cme_20251003_1036", "wsa_enlil.mrid00057579.suball.nc") # CME
+    if os.path.exists(data_file):
+        ds = read_nc(data_file)
+    else:
+        print("Data file does not exist:", data_file)
+        return
+
+    # data_path = os.path.join("Data", f"swpc_wsaenlil_bkg_{yr:02d}{mo:02d}{da:02d}_0000")
+    # if os.path.exists(data_path):
+    #     data_file = os.path.join(data_path, "wsa_enlil.mrid00000000.suball.nc")
+    #     if os.path.exists(data_file):
+    #         # Open .nc data file.
+    #         ds = read_nc(data_file)
+
+    #     else:
+    #         print("Data file does not exist:", data_file)
+    # else:
+    #     print("Data path does not exist:", data_path)
+
+
+    radial_position_m = np.array(ds['x_coord']) # m
+    colatitudes_rad = np.array(ds['y_coord']) # radians
+    longitudes_rad = np.array(ds['z_coord']) # radians 
+
+    # Convert to desired units.
+    R_e = 6371 # radius of Earth in km
+    radial_position_km = radial_position_m / 1000
+    altitudes_km = radial_position_km - R_e
+    colatitudes_deg = colatitudes_rad * 180/np.pi
+    latitudes_deg = 90 - colatitudes_deg
+    longitudes_deg = longitudes_rad * 180/np.pi
+
+    # =============================================================================
+    # 2D World Map
+    # =============================================================================
+    # vals = np.array(ds['dd23_3d'])
+    # vals.shape # time, lon, colat
+
+    # longitudes_ls = []
+    # latitudes_ls = []
+    # density_ls = []
+    # for lo, lon in enumerate(longitudes_deg):
+    #     for la, lat in enumerate(latitudes_deg):
+    #         longitudes_ls.append(convert_lon(lon))
+    #         latitudes_ls.append(lat)
+    #         density_ls.append(vals[0,lo,la])
+
+    # grid_density = pd.DataFrame()
+    # grid_density['Lat'] = latitudes_ls
+    # grid_density['Lon'] = longitudes_ls
+    # #grid_density['Alt'] = altitudes_km
+    # grid_density['Plasma Density'] = density_ls
+
+    # describe_grid(grid_density)
+
+    # map_window_2D(grid_density)
+
+
+    # =============================================================================
+    # 3D Polar Map
+    # =============================================================================
+    var = 'pp13_3d'
+    vals = np.array(ds[var])
+    vals.shape # uncalibrated plasma density in rad-colat-time, longitude zero
+    #units = ds[var].attrs['units']
+
+    t=136
+    longitudes_ls = []
+    altitudes_ls = []
+    #latitudes_ls = []
+    density_ls = []
+    for a, alt in enumerate(altitudes_km):
+        for lo, lon in enumerate(longitudes_deg):
+            altitudes_ls.append(alt)
+            longitudes_ls.append(convert_lon(lon))
+            density_ls.append(vals[t,lo,a])
+
+    grid_density = pd.DataFrame()
+    grid_density['Lon'] = longitudes_ls
+    grid_density['Alt'] = altitudes_ls
+    grid_density['Plasma Density'] = density_ls
+
+    # describe_grid(grid_density)
+    # map_window_polar(grid_density)
+
+    polar_map_grid(grid_density, np.max(vals))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,8 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
 from datetime import datetime
 
-# Optional imports (uncomment when installed)
-# from nrlmsise00 import msise_model
-# from spaceweather import get_f107_ap   # hypothetical or custom wrapper
+from atmosphere_models import available_models, get_model
+from drag_engine import fleet_drag
+from space_weather_cache import SpaceWeatherTable, load_sw_daily
 
 # -------------------------------------------------------------------
 # Presets and placeholders
@@ -20,12 +18,6 @@ PRESETS = {
 # -------------------------------------------------------------------
 # Core physics & model utilities
 # -------------------------------------------------------------------
-def adjust_density_for_space_weather(rho, F10_7, Ap):
-    F_ref, Ap_ref = 150, 15
-    scale = (1.0 + 0.002 * (F10_7 - F_ref)) * (1.0 + 0.01 * (Ap - Ap_ref))
-    return rho * max(scale, 0.1)
-
-
 def compute_drag():
     """Compute drag acceleration from user input or model data."""
     try:
@@ -39,32 +31,49 @@ def compute_drag():
 
         # Determine how to get rho and space weather data
         if model_mode.get():
-            # User selected to use NRLMSISE / SpaceWeather model
+            # Model density already includes space weather: no further scaling
             rho, F10_7, Ap = fetch_model_data(lat, lon, alt)
+            result = fleet_drag(Cd, A, m, rho, v)
         else:
             rho = float(density_entry.get())
             F10_7 = float(f107_entry.get()) if f107_entry.get() else 150
             Ap = float(ap_entry.get()) if ap_entry.get() else 15
+            result = fleet_drag(Cd, A, m, rho, v, F10_7=F10_7, Ap=Ap)
 
-        rho = adjust_density_for_space_weather(rho, F10_7, Ap)
-        a_drag = 0.5 * Cd * (A / m) * rho * v**2
-        result_label.config(text=f"Drag Acceleration: {a_drag:.6e} m/s²\nρ = {rho:.2e}")
+        a_drag, rho = abs(float(result["a_drag"])), float(result["rho"])
+        result_label.config(text=f"Drag Acceleration: {a_drag:.6e} m/s²\nρ = {rho:.2e}"
+                                 f" (F10.7 = {F10_7:.0f}, Ap = {Ap:.0f})")
 
     except ValueError:
+        from tkinter import messagebox
         messagebox.showerror("Input Error", "Please enter valid numeric values.")
 
 
-# from nrlmsise00 import msise_model # pip install msise00, pip install nrlmsise00
-# from spaceweather import get_f107_ap
+_ATMOSPHERE_MODEL = None
+
 
-# def fetch_model_data(lat, lon, alt):
-#     dt = datetime.strptime(date_entry.get() + " " + time_entry.get(), "%Y-%m-%d %H:%M")
-#     F10_7, Ap = get_f107_ap(dt)
-#     atm = msise_model(dt, alt_km=alt, lat_deg=lat, lon_deg=lon, f107=F10_7, ap=Ap)
-#     rho = atm["Total"]["rho"]
-#     return rho, F10_7, Ap
+def atmosphere_model():
+    """NRLMSISE-00 if installed, else the density table, fed by cached daily indices."""
+    global _ATMOSPHERE_MODEL
+    if _ATMOSPHERE_MODEL is None:
+        try:
+            space_weather = load_sw_daily()
+        except Exception as e:          # offline / spaceweather not installed
+            print(f"Space weather unavailable ({e}); using F10.7 = 150, Ap = 15")
+            space_weather = SpaceWeatherTable.constant()
+        name = "nrlmsise00" if "nrlmsise00" in available_models() else "table"
+        _ATMOSPHERE_MODEL = get_model(name, space_weather)
+    return _ATMOSPHERE_MODEL
 
 
+def fetch_model_data(lat, lon, alt):
+    """Density [kg/m³], F10.7 and Ap at the entered UTC date/time."""
+    dt = datetime.strptime(date_entry.get() + " " + time_entry.get(), "%Y-%m-%d %H:%M")
+    model = atmosphere_model()
+    rho, _ = model(dt, lat, lon, alt)
+    F10_7, _, Ap = model.indices(dt)
+    return float(rho), float(F10_7), float(Ap)
+
 
 # -------------------------------------------------------------------
 # UI logic
@@ -73,13 +82,15 @@ def apply_preset(event=None):
     preset = preset_var.get()
     params = PRESETS[preset]
     for entry, key in zip(entries, ["Cd", "A", "m", "rho", "v_rel"]):
-        entry.delete(0, tk.END)
+        entry.delete(0, "end")
         if params[key] != "":
             entry.insert(0, params[key])
 
 
 def toggle_model_mode():
     """Switch between manual entry mode and model-based mode."""
+    from tkinter import ttk
+
     use_model = model_mode.get()
     for e in [density_entry, f107_entry, ap_entry]:
         e.config(state="disabled" if use_model else "normal")
@@ -96,96 +107,108 @@ def toggle_model_mode():
 # -------------------------------------------------------------------
 # Build GUI
 # -------------------------------------------------------------------
-root = tk.Tk()
-root.title("Orbital Drag Calculator")
-root.geometry("520x650")
-root.resizable(False, False)
-
-ttk.Label(root, text="Orbital Drag Calculator", font=("Helvetica", 16, "bold")).pack(pady=10)
-
-# Preset orbit menu
-preset_frame = ttk.Frame(root, padding=(10, 5))
-preset_frame.pack(fill="x")
-ttk.Label(preset_frame, text="Select Preset Orbit:").pack(side="left", padx=(0, 10))
-preset_var = tk.StringVar(value="Custom")
-preset_menu = ttk.Combobox(preset_frame, textvariable=preset_var, values=list(PRESETS.keys()), state="readonly")
-preset_menu.pack(side="left", fill="x", expand=True)
-preset_menu.bind("<<ComboboxSelected>>", apply_preset)
-
-# Drag equation variables
-frame = ttk.Frame(root, padding=10)
-frame.pack(fill="x")
-
-labels = [
-    ("Drag Coefficient (Cd)", "dimensionless"),
-    ("Cross-sectional Area (A)", "m²"),
-    ("Mass (m)", "kg"),
-    ("Atmospheric Density (ρ)", "kg/m³"),
-    ("Relative Velocity (v_rel)", "m/s"),
-]
-entries = []
-for label_text, unit in labels:
-    row = ttk.Frame(frame)
-    row.pack(fill="x", pady=5)
-    lbl = ttk.Label(row, text=label_text, width=25)
-    lbl.pack(side="left")
-    entry = ttk.Entry(row)
-    entry.pack(side="left", fill="x", expand=True)
-    ttk.Label(row, text=unit, width=10).pack(side="right")
-    entries.append(entry)
-cd_entry, area_entry, mass_entry, density_entry, vrel_entry = entries
-density_label = frame.winfo_children()[3].winfo_children()[0]  # label for ρ
-
-# Space weather section
-sw_frame = ttk.LabelFrame(root, text="Space Weather Settings", padding=10)
-sw_frame.pack(fill="x", padx=10, pady=10)
-
-model_mode = tk.BooleanVar(value=False)
-ttk.Checkbutton(sw_frame, text="Use Date/Time and NRLMSISE-00 Model", variable=model_mode,
-                command=toggle_model_mode).pack(anchor="w", pady=(0, 10))
-
-# Manual space weather inputs
-manual_frame = ttk.Frame(sw_frame)
-manual_frame.pack(fill="x")
-ttk.Label(manual_frame, text="Solar Flux (F10.7)", width=25).pack(side="left")
-f107_entry = ttk.Entry(manual_frame)
-f107_entry.pack(side="left", fill="x", expand=True)
-ttk.Label(manual_frame, text="sfu", width=10).pack(side="right")
-
-manual_frame2 = ttk.Frame(sw_frame)
-manual_frame2.pack(fill="x", pady=5)
-ttk.Label(manual_frame2, text="Geomagnetic Index (Ap)", width=25).pack(side="left")
-ap_entry = ttk.Entry(manual_frame2)
-ap_entry.pack(side="left", fill="x", expand=True)
-ttk.Label(manual_frame2, text="unitless", width=10).pack(side="right")
-
-# Date/time inputs for model mode
-date_frame = ttk.Frame(sw_frame)
-date_frame.pack(fill="x", pady=5)
-date_label = ttk.Label(date_frame, text="Date (YYYY-MM-DD)", width=25, foreground="#888")
-date_label.pack(side="left")
-date_entry = ttk.Entry(date_frame, state="disabled")
-date_entry.pack(side="left", fill="x", expand=True)
-ttk.Label(date_frame, text="").pack(side="right")
-
-time_frame = ttk.Frame(sw_frame)
-time_frame.pack(fill="x", pady=5)
-time_label = ttk.Label(time_frame, text="Time (HH:MM, UTC)", width=25, foreground="#888")
-time_label.pack(side="left")
-time_entry = ttk.Entry(time_frame, state="disabled")
-time_entry.pack(side="left", fill="x", expand=True)
-
-# Compute
-ttk.Button(root, text="Compute Drag Acceleration", command=compute_drag).pack(pady=15)
-result_label = ttk.Label(root, text="", font=("Helvetica", 12))
-result_label.pack(pady=10)
-
-# Footer
-ttk.Label(
-    root,
-    text="Supports manual inputs or model-based atmospheric data.\nNRLMSISE-00 integration placeholder.",
-    font=("Helvetica", 8, "italic"),
-    justify="center"
-).pack(pady=(20, 0))
-
-root.mainloop()
+def main():
+    """Build and run the Tk drag calculator."""
+    global root, preset_var, entries, cd_entry, area_entry, mass_entry, density_entry, vrel_entry
+    global density_label, sw_frame, model_mode, f107_entry, ap_entry, date_label, date_entry
+    global time_label, time_entry, result_label
+    import tkinter as tk
+    from tkinter import ttk
+
+    root = tk.Tk()
+    root.title("Orbital Drag Calculator")
+    root.geometry("520x650")
+    root.resizable(False, False)
+
+    ttk.Label(root, text="Orbital Drag Calculator", font=("Helvetica", 16, "bold")).pack(pady=10)
+
+    # Preset orbit menu
+    preset_frame = ttk.Frame(root, padding=(10, 5))
+    preset_frame.pack(fill="x")
+    ttk.Label(preset_frame, text="Select Preset Orbit:").pack(side="left", padx=(0, 10))
+    preset_var = tk.StringVar(value="Custom")
+    preset_menu = ttk.Combobox(preset_frame, textvariable=preset_var, values=list(PRESETS.keys()), state="readonly")
+    preset_menu.pack(side="left", fill="x", expand=True)
+    preset_menu.bind("<<ComboboxSelected>>", apply_preset)
+
+    # Drag equation variables
+    frame = ttk.Frame(root, padding=10)
+    frame.pack(fill="x")
+
+    labels = [
+        ("Drag Coefficient (Cd)", "dimensionless"),
+        ("Cross-sectional Area (A)", "m²"),
+        ("Mass (m)", "kg"),
+        ("Atmospheric Density (ρ)", "kg/m³"),
+        ("Relative Velocity (v_rel)", "m/s"),
+    ]
+    entries = []
+    for label_text, unit in labels:
+        row = ttk.Frame(frame)
+        row.pack(fill="x", pady=5)
+        lbl = ttk.Label(row, text=label_text, width=25)
+        lbl.pack(side="left")
+        entry = ttk.Entry(row)
+        entry.pack(side="left", fill="x", expand=True)
+        ttk.Label(row, text=unit, width=10).pack(side="right")
+        entries.append(entry)
+    cd_entry, area_entry, mass_entry, density_entry, vrel_entry = entries
+    density_label = frame.winfo_children()[3].winfo_children()[0]  # label for ρ
+
+    # Space weather section
+    sw_frame = ttk.LabelFrame(root, text="Space Weather Settings", padding=10)
+    sw_frame.pack(fill="x", padx=10, pady=10)
+
+    model_mode = tk.BooleanVar(value=False)
+    ttk.Checkbutton(sw_frame, text="Use Date/Time and Atmosphere Model", variable=model_mode,
+                    command=toggle_model_mode).pack(anchor="w", pady=(0, 10))
+
+    # Manual space weather inputs
+    manual_frame = ttk.Frame(sw_frame)
+    manual_frame.pack(fill="x")
+    ttk.Label(manual_frame, text="Solar Flux (F10.7)", width=25).pack(side="left")
+    f107_entry = ttk.Entry(manual_frame)
+    f107_entry.pack(side="left", fill="x", expand=True)
+    ttk.Label(manual_frame, text="sfu", width=10).pack(side="right")
+
+    manual_frame2 = ttk.Frame(sw_frame)
+    manual_frame2.pack(fill="x", pady=5)
+    ttk.Label(manual_frame2, text="Geomagnetic Index (Ap)", width=25).pack(side="left")
+    ap_entry = ttk.Entry(manual_frame2)
+    ap_entry.pack(side="left", fill="x", expand=True)
+    ttk.Label(manual_frame2, text="unitless", width=10).pack(side="right")
+
+    # Date/time inputs for model mode
+    date_frame = ttk.Frame(sw_frame)
+    date_frame.pack(fill="x", pady=5)
+    date_label = ttk.Label(date_frame, text="Date (YYYY-MM-DD)", width=25, foreground="#888")
+    date_label.pack(side="left")
+    date_entry = ttk.Entry(date_frame, state="disabled")
+    date_entry.pack(side="left", fill="x", expand=True)
+    ttk.Label(date_frame, text="").pack(side="right")
+
+    time_frame = ttk.Frame(sw_frame)
+    time_frame.pack(fill="x", pady=5)
+    time_label = ttk.Label(time_frame, text="Time (HH:MM, UTC)", width=25, foreground="#888")
+    time_label.pack(side="left")
+    time_entry = ttk.Entry(time_frame, state="disabled")
+    time_entry.pack(side="left", fill="x", expand=True)
+
+    # Compute
+    ttk.Button(root, text="Compute Drag Acceleration", command=compute_drag).pack(pady=15)
+    result_label = ttk.Label(root, text="", font=("Helvetica", 12))
+    result_label.pack(pady=10)
+
+    # Footer
+    ttk.Label(
+        root,
+        text="Supports manual inputs or model-based atmospheric data.\nNRLMSISE-00 when installed, else the tabulated density model.",
+        font=("Helvetica", 8, "italic"),
+        justify="center"
+    ).pack(pady=(20, 0))
+
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
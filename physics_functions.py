@@ -18,10 +18,10 @@ Identify required space-weather data sources:
 Collect historical datasets for validation:
     Historical TLE archives (Celestrak), satellite reentry/decay logs, and historical indices from OMNI/NOAA.
 """
-import spaceweather as sw
-import pandas as pd
 import numpy as np
 
+from coordinates import OMEGA_EARTH
+
 def calc_drag_acceleration(Cd, A, m, rho, v_rel):
     """
     
@@ -43,56 +43,77 @@ def calc_drag_acceleration(Cd, A, m, rho, v_rel):
     return a_d
 
 
-def get_atm_density():
-    # Total mass density
-    return 0
+def get_atm_density(alt_km, lat=0.0, local_time_h=12.0, F10_7=150.0, F10_7a=None, Ap=15.0):
+    """
+    Total mass density [kg/m³] from the tabulated model in atm_density
+    (scalars or arrays; the table is built once and memory-mapped).
+    """
+    # Imported here so the drag equation does not pull in the table machinery
+    from atm_density import load_or_build
+    return load_or_build().query(alt_km, local_time_h, lat, F10_7, F10_7a, Ap)
 
 
 # Constants
-omega_E = 7.2921159e-5  # rad/s
 R_E = 6371e3  # m
 
-def relative_velocity(r_eci, v_eci):
-    """Compute relative velocity vector and magnitude (m/s)"""
-    omega_vec = np.array([0, 0, omega_E])
-    v_atm = np.cross(omega_vec, r_eci)  # co-rotating atmosphere
-    v_rel = v_eci - v_atm
-    return v_rel, np.linalg.norm(v_rel)
+def relative_velocity(r_eci, v_eci, out=None):
+    """
+    Velocity relative to the co-rotating atmosphere, v - ω × r (m/s).
+
+    r_eci [m] and v_eci [m/s] are 3-vectors or (..., 3) arrays (broadcast);
+    `out`, if given, receives the relative velocity vectors.
+    Returns (v_rel vectors, |v_rel|).
+    """
+    r_eci, v_eci = np.asarray(r_eci, dtype=float), np.asarray(v_eci, dtype=float)
+    if r_eci.shape[-1:] != (3,) or v_eci.shape[-1:] != (3,):
+        raise ValueError("r_eci and v_eci must be 3-vectors or (..., 3) arrays")
+    if out is None:
+        out = np.empty(np.broadcast_shapes(r_eci.shape, v_eci.shape))
+    out[..., 0] = v_eci[..., 0] + OMEGA_EARTH * r_eci[..., 1]
+    out[..., 1] = v_eci[..., 1] - OMEGA_EARTH * r_eci[..., 0]
+    out[..., 2] = v_eci[..., 2]
+    return out, np.sqrt(np.einsum("...i,...i->...", out, out))
+
+if __name__ == "__main__":
+    r = [R_E + 1000e3, 0.0, 0.0]
+    v = [0.0, 7350.0, 0.0]
+    print("A satellite in a prograde equatorial orbit at 1000 km (7350 m/s) has a relative velocity of:",
+          relative_velocity(r, v)[1], "m/s")
 
-print("A satellite travelling at 10 m/s at 1000 km would have a relative velocity of:", relative_velocity([500, 500, 1000], 10))
+    import spaceweather as sw
 
 
-# Input: Date and time
-# Output: Kp and Ap indices
-df_3h = sw.ap_kp_3h()
-print(df_3h.loc["2000-01-01 01:30:00"])
+    # Input: Date and time
+    # Output: Kp and Ap indices
+    df_3h = sw.ap_kp_3h()
+    print(df_3h.loc["2000-01-01 01:30:00"])
 
 
-# Get the combined daily space weather data
-# The 'update=True' argument ensures the latest data is downloaded if available.
-# 'update_interval' can be adjusted, e.g., '1day', '7days', '30days'
-sw_data = sw.celestrak.sw_daily(update=True)
+    # Get the combined daily space weather data
+    # The 'update=True' argument ensures the latest data is downloaded if available.
+    # 'update_interval' can be adjusted, e.g., '1day', '7days', '30days'
+    sw_data = sw.celestrak.sw_daily(update=True)
 
-# The returned object is a pandas DataFrame,
-# containing columns for various space weather indices, including 'f107_obs' (observed F10.7)
-# and 'f107_adj' (1 AU adjusted F10.7).
+    # The returned object is a pandas DataFrame,
+    # containing columns for various space weather indices, including 'f107_obs' (observed F10.7)
+    # and 'f107_adj' (1 AU adjusted F10.7).
 
-# To access the F10.7 observed values:
-f107_observed = sw_data['f107_obs']
+    # To access the F10.7 observed values:
+    f107_observed = sw_data['f107_obs']
 
-# To access the F10.7 1 AU adjusted values:
-f107_adjusted = sw_data['f107_adj']
+    # To access the F10.7 1 AU adjusted values:
+    f107_adjusted = sw_data['f107_adj']
 
-# You can also filter for specific dates if needed.
-# For example, to get F10.7 for a specific date:
-# specific_date = pd.Timestamp('2025-10-26')
-# f107_on_date = sw_data.loc[specific_date, 'f107_obs']
+    # You can also filter for specific dates if needed.
+    # For example, to get F10.7 for a specific date:
+    # specific_date = pd.Timestamp('2025-10-26')
+    # f107_on_date = sw_data.loc[specific_date, 'f107_obs']
 
-print("Observed F10.7 data (first 5 entries):")
-print(f107_observed.head())
+    print("Observed F10.7 data (first 5 entries):")
+    print(f107_observed.head())
 
-print("\n1 AU Adjusted F10.7 data (first 5 entries):")
-print(f107_adjusted.head())
+    print("\n1 AU Adjusted F10.7 data (first 5 entries):")
+    print(f107_adjusted.head())
 
 
 """
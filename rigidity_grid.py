@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Precomputed cutoff-rigidity lookup grid.
+
+Evaluates GTF.compute_cutoff_rigidity once on a regular
+lat × lon × altitude × epoch grid, stores the table on disk (.npz) and
+answers Rc queries by vectorized multilinear interpolation instead of
+calling IGRF for every point.
+
+Accuracy
+--------
+When the grid is built with `estimate_error=True`, Rc is also evaluated
+live at the centre of every lat/lon/alt cell (worst spatial interpolation
+error per cell over all epochs) and on the grid nodes halfway between
+consecutive epochs (worst temporal error, taken over each cell's corners).
+The error bound of a cell is the sum of the two. Queries may then pass
+`max_error` [GV]: points that fall in a cell whose estimated error exceeds
+it, or that lie outside the grid (where interpolation would clamp to the
+edge), are recomputed live with IGRF, so the answer stays within the
+requested tolerance (to the accuracy of the midpoint estimates).
+
+A new IGRF release or a new epoch range only needs `grid.rebuild(epochs)`,
+which keeps the spatial layout and re-evaluates the table.
+
+Example
+-------
+    grid = load_or_build()
+    Rc = grid.query(lats, lons, alts, dates, max_error=0.2)
+"""
+
+import os
+import numpy as np
+from datetime import datetime
+
+from coordinates import wrap_lon
+from GTF import compute_cutoff_rigidity_batch
+from grid_interpolation import locate, multilinear_interpolate
+from igrf_cache import as_datetime64, decimal_year
+
+DEFAULT_GRID_FILE = os.path.join("Data", "rc_grid.npz")
+
+DEFAULT_LATS = np.arange(-90.0, 90.1, 2.0)           # deg
+DEFAULT_LONS = np.arange(-180.0, 180.1, 5.0)         # deg
+DEFAULT_ALTS = np.array([0.0, 200.0, 400.0, 600.0, 800.0,
+                         1000.0, 1500.0, 2000.0])    # km
+DEFAULT_EPOCHS = np.arange(2020.0, 2031.0, 1.0)      # decimal year
+
+
+def _cell_max(node_values):
+    """Maximum over the 2^D corners of every cell of a node-valued array."""
+    out = node_values
+    for d in range(node_values.ndim):
+        if out.shape[d] > 1:
+            lo = [slice(None)] * out.ndim
+            hi = [slice(None)] * out.ndim
+            lo[d], hi[d] = slice(None, -1), slice(1, None)
+            out = np.maximum(out[tuple(lo)], out[tuple(hi)])
+    return out
+
+
+class RigidityGrid:
+    """
+    Cutoff rigidity Rc [GV] tabulated on lat × lon × alt × epoch.
+
+    Attributes:
+        lats, lons, alts, epochs (ndarray): grid axes [deg, deg, km, decimal year]
+        Rc (ndarray): table of shape (n_lat, n_lon, n_alt, n_epoch) [GV]
+        cell_error (ndarray or None): estimated max spatial interpolation
+            error per lat/lon/alt cell, shape (n_lat-1, n_lon-1, n_alt-1) [GV]
+        epoch_error (ndarray or None): estimated max temporal interpolation
+            error per cell, same shape as cell_error [GV]
+    """
+
+    def __init__(self, lats, lons, alts, epochs, Rc, cell_error=None, epoch_error=None):
+        self.lats = np.asarray(lats, dtype=float)
+        self.lons = np.asarray(lons, dtype=float)
+        self.alts = np.asarray(alts, dtype=float)
+        self.epochs = np.asarray(epochs, dtype=float)
+        self.Rc = np.asarray(Rc)
+        self.cell_error = None if cell_error is None else np.asarray(cell_error)
+        self.epoch_error = None if epoch_error is None else np.asarray(epoch_error)
+
+    @property
+    def axes(self):
+        return (self.lats, self.lons, self.alts, self.epochs)
+
+    # ---------------------------------------------------
+    # Building
+    # ---------------------------------------------------
+    @classmethod
+    def build(cls, lats=DEFAULT_LATS, lons=DEFAULT_LONS, alts=DEFAULT_ALTS,
+              epochs=DEFAULT_EPOCHS, estimate_error=True, dtype=np.float32):
+        """Evaluate Rc on the full grid (one batched IGRF call per epoch)."""
+        lats, lons, alts, epochs = (np.asarray(a, dtype=float) for a in (lats, lons, alts, epochs))
+        LAT, LON, ALT = np.meshgrid(lats, lons, alts, indexing="ij")
+
+        Rc = np.empty(LAT.shape + (epochs.size,), dtype=dtype)
+        cell_error = epoch_error = None
+        if estimate_error:
+            mid = [0.5 * (a[1:] + a[:-1]) if a.size > 1 else a for a in (lats, lons, alts)]
+            MLAT, MLON, MALT = np.meshgrid(*mid, indexing="ij")
+            cell_error = np.zeros(MLAT.shape, dtype=dtype)
+
+        for j, epoch in enumerate(epochs):
+            date = as_datetime64(epoch)
+            Rc[..., j], _ = compute_cutoff_rigidity_batch(LAT, LON, ALT, date)
+            if estimate_error:
+                exact, _ = compute_cutoff_rigidity_batch(MLAT, MLON, MALT, date)
+                approx = multilinear_interpolate((lats, lons, alts), Rc[..., j], (MLAT, MLON, MALT))
+                cell_error = np.maximum(cell_error, np.abs(exact - approx))
+
+        if estimate_error:
+            # Temporal error on the nodes halfway between epochs, then the
+            # worst corner of every cell.
+            node_error = np.zeros(LAT.shape)
+            for j in range(epochs.size - 1):
+                date = as_datetime64(0.5 * (epochs[j] + epochs[j + 1]))
+                exact, _ = compute_cutoff_rigidity_batch(LAT, LON, ALT, date)
+                approx = 0.5 * (Rc[..., j].astype(float) + Rc[..., j + 1])
+                node_error = np.maximum(node_error, np.abs(exact - approx))
+            epoch_error = _cell_max(node_error).astype(dtype)
+
+        return cls(lats, lons, alts, epochs, Rc, cell_error, epoch_error)
+
+    def rebuild(self, epochs=None, estimate_error=None):
+        """
+        Re-evaluate the table on the same spatial grid, e.g. for a new IGRF
+        release or a new epoch range.
+        """
+        if epochs is None:
+            epochs = self.epochs
+        if estimate_error is None:
+            estimate_error = self.cell_error is not None
+        return type(self).build(self.lats, self.lons, self.alts, epochs,
+                                estimate_error=estimate_error, dtype=self.Rc.dtype)
+
+    # ---------------------------------------------------
+    # Persistence
+    # ---------------------------------------------------
+    def save(self, path=DEFAULT_GRID_FILE):
+        arrays = {"lats": self.lats, "lons": self.lons, "alts": self.alts,
+                  "epochs": self.epochs, "Rc": self.Rc}
+        if self.cell_error is not None:
+            arrays["cell_error"] = self.cell_error
+        if self.epoch_error is not None:
+            arrays["epoch_error"] = self.epoch_error
+        np.savez_compressed(path, **arrays)
+        return path
+
+    @classmethod
+    def load(cls, path=DEFAULT_GRID_FILE):
+        with np.load(path) as data:
+            cell_error = data["cell_error"] if "cell_error" in data.files else None
+            epoch_error = data["epoch_error"] if "epoch_error" in data.files else None
+            return cls(data["lats"], data["lons"], data["alts"], data["epochs"],
+                       data["Rc"], cell_error, epoch_error)
+
+    # ---------------------------------------------------
+    # Queries
+    # ---------------------------------------------------
+    def in_domain(self, lat, lon, alt_km, dates=None):
+        """True where a point lies inside the grid axes (epochs too, if dates are given)."""
+        points = [np.asarray(lat, dtype=float), wrap_lon(lon), np.asarray(alt_km, dtype=float)]
+        axes = [self.lats, self.lons, self.alts]
+        if dates is not None:
+            points.append(np.asarray(decimal_year(dates), dtype=float))
+            axes.append(self.epochs)
+        points = np.broadcast_arrays(*points)
+        inside = np.ones(points[0].shape, dtype=bool)
+        for axis, p in zip(axes, points):
+            if axis is self.lons and axis[-1] - axis[0] >= 360.0:
+                continue  # longitudes wrap, so a full-circle axis has no edge
+            inside &= (p >= axis[0]) & (p <= axis[-1])
+        return inside
+
+    def error_bound(self, lat, lon, alt_km, dates=None):
+        """
+        Estimated interpolation error [GV] of the cell containing each point
+        (spatial plus temporal); inf for points outside the grid.
+        """
+        if self.cell_error is None:
+            raise ValueError("Grid was built without error estimates (estimate_error=False).")
+        lat, lon, alt_km = np.broadcast_arrays(lat, wrap_lon(lon), alt_km)
+        index = tuple(np.minimum(locate(axis, p)[0], max(axis.size - 2, 0))
+                      for axis, p in zip((self.lats, self.lons, self.alts), (lat, lon, alt_km)))
+        bound = self.cell_error[index].astype(float)
+        if self.epoch_error is not None:
+            bound = bound + self.epoch_error[index]
+        return np.where(self.in_domain(lat, lon, alt_km, dates), bound, np.inf)
+
+    def query(self, lat, lon, alt_km, dates, max_error=None):
+        """
+        Interpolated cutoff rigidity Rc [GV].
+
+        Parameters:
+            lat, lon, alt_km (array_like): positions [deg, deg, km]
+            dates: datetimes, datetime64 values or decimal years
+            max_error (float, optional): tolerance [GV]; points in cells whose
+                estimated error exceeds it, and points outside the grid, are
+                computed live with IGRF.
+
+        Returns:
+            ndarray of Rc with the broadcast shape of the inputs.
+        """
+        lat, lon, alt_km, years = np.broadcast_arrays(
+            np.asarray(lat, dtype=float), wrap_lon(lon),
+            np.asarray(alt_km, dtype=float), decimal_year(dates))
+        Rc = multilinear_interpolate(self.axes, self.Rc, (lat, lon, alt_km, years))
+
+        if max_error is not None:
+            live = self.error_bound(lat, lon, alt_km, years) > max_error
+            if np.any(live):
+                dates_live = np.broadcast_to(as_datetime64(dates), lat.shape)[live]
+                Rc[live], _ = compute_cutoff_rigidity_batch(
+                    lat[live], lon[live], alt_km[live], dates_live)
+        return Rc
+
+
+def load_or_build(path=DEFAULT_GRID_FILE, **build_kwargs):
+    """Load the grid from disk, building and saving it on first use."""
+    if os.path.exists(path):
+        return RigidityGrid.load(path)
+    grid = RigidityGrid.build(**build_kwargs)
+    grid.save(path)
+    return grid
+
+
+if __name__ == "__main__":
+    import time
+
+    grid = load_or_build()
+    print(f"Grid: {grid.Rc.shape}, max estimated cell error "
+          f"{float(grid.cell_error.max()):.3f} GV")
+
+    n = 1_000_000
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(-90, 90, n)
+    lons = rng.uniform(-180, 180, n)
+    alts = rng.uniform(0, 2000, n)
+    t0 = time.perf_counter()
+    Rc = grid.query(lats, lons, alts, datetime(2025, 11, 9))
+    print(f"{n} interpolated queries in {time.perf_counter() - t0:.2f} s")
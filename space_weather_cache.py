@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cached space-weather index tables with vectorized timestamp lookup.
+
+Index time series (3-hour Kp/Ap, daily F10.7/Ap, ...) are downloaded once
+through the `spaceweather` package, stored as .npz files under
+DEFAULT_CACHE_DIR and joined to arbitrary timestamps with a sorted-index
+search, so a whole trajectory is matched in one call instead of one
+request per point.
+
+Example
+-------
+    kp, ap = load_kp_3h()
+    kp_at_samples = kp.lookup(traj["Time"].to_numpy())
+
+    f107, f107a, ap_daily = load_sw_daily().lookup(times)
+"""
+
+import os
+import time
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.path.join("Data", "space_weather_cache")
+DEFAULT_MAX_AGE = 24 * 3600  # s before a cached table is refreshed
+
+
+class IndexSeries:
+    """
+    A sorted index time series with vectorized lookup.
+
+    Parameters:
+        times (array): sample times (datetime64 or anything numpy converts)
+        values (array): index values
+        name (str, optional): index name, for display
+        method (str): "previous" (value of the latest sample at or before
+            each query) or "nearest"
+        max_gap (timedelta-like, optional): queries farther than this from
+            the matched sample return NaN
+    """
+
+    def __init__(self, times, values, name=None, method="previous", max_gap=None):
+        times = np.asarray(times, dtype="datetime64[ns]")
+        order = np.argsort(times, kind="stable")
+        self.times = times[order]
+        self.values = np.asarray(values, dtype=float)[order]
+        self.name = name
+        self.method = method
+        self.max_gap = None if max_gap is None else np.timedelta64(max_gap, "ns")
+
+    @classmethod
+    def from_series(cls, series, **kwargs):
+        """Build from a pandas Series indexed by timestamp."""
+        kwargs.setdefault("name", series.name)
+        return cls(series.index.to_numpy(dtype="datetime64[ns]"), series.to_numpy(dtype=float), **kwargs)
+
+    def __len__(self):
+        return len(self.times)
+
+    def lookup(self, times, method=None):
+        """Index values at `times` (any shape); NaN outside the table."""
+        method = method or self.method
+        t = np.asarray(times, dtype="datetime64[ns]")
+        shape = t.shape
+        t = t.ravel()
+        if len(self.times) == 0:
+            return np.full(shape, np.nan)
+
+        idx = np.searchsorted(self.times, t, side="right") - 1
+        if method == "nearest":
+            nxt = np.minimum(idx + 1, len(self.times) - 1)
+            prev = np.maximum(idx, 0)
+            use_next = (idx < 0) | (np.abs(self.times[nxt] - t) < np.abs(t - self.times[prev]))
+            idx = np.where(use_next, nxt, prev)
+        elif method != "previous":
+            raise ValueError(f"Unknown lookup method '{method}'.")
+
+        out = self.values[np.clip(idx, 0, len(self.times) - 1)]
+        invalid = idx < 0
+        if self.max_gap is not None:
+            invalid |= np.abs(t - self.times[np.clip(idx, 0, len(self.times) - 1)]) > self.max_gap
+        return np.where(invalid, np.nan, out).reshape(shape)
+
+    def save(self, path):
+        np.savez(path, times=self.times.astype(np.int64), values=self.values,
+                 name=np.array(self.name or ""))
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        with np.load(path) as data:
+            kwargs.setdefault("name", str(data["name"]) or None)
+            return cls(data["times"].astype("datetime64[ns]"), data["values"], **kwargs)
+
+
+def _cached(path, max_age, fetch):
+    """Load `path` if it is fresh enough, else call fetch() and store the result."""
+    if os.path.exists(path) and (max_age is None or time.time() - os.path.getmtime(path) < max_age):
+        return np.load(path)
+    arrays = fetch()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez(path, **arrays)
+    return np.load(path)
+
+
+def load_kp_3h(cache_dir=DEFAULT_CACHE_DIR, max_age=DEFAULT_MAX_AGE):
+    """
+    3-hour planetary Kp and ap indices (GFZ, via the spaceweather package).
+
+    The table is timestamped at the interval centres (01:30, 04:30, ...),
+    so lookups use the nearest sample within 1.5 h.
+
+    Returns:
+        (kp, ap): IndexSeries
+    """
+    def fetch():
+        import spaceweather as sw
+
+        df = sw.ap_kp_3h()
+        times = df.index.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        return {"times": times, "Kp": df["Kp"].to_numpy(dtype=float),
+                "Ap": df["Ap"].to_numpy(dtype=float)}
+
+    with _cached(os.path.join(cache_dir, "kp_ap_3h.npz"), max_age, fetch) as data:
+        times = data["times"].astype("datetime64[ns]")
+        opts = {"method": "nearest", "max_gap": np.timedelta64(90, "m")}
+        return (IndexSeries(times, data["Kp"], "Kp", **opts),
+                IndexSeries(times, data["Ap"], "Ap", **opts))
+
+
+# Fixed start for tables of constant indices (any later query matches it)
+_CONSTANT_EPOCH = np.datetime64("1900-01-01", "ns")
+
+
+class SpaceWeatherTable:
+    """
+    Daily F10.7, 81-day centred mean F10.7 and daily Ap for thermosphere
+    and drag models, looked up together for arrays of timestamps.
+
+    Each lookup returns the latest daily value at or before the query time
+    (the last day of the table carries forward); times before the table
+    fall back to `fill` (F10.7 = F10.7a = 150 sfu, Ap = 15 by default).
+    """
+
+    def __init__(self, f107, f107a, ap, fill=(150.0, 150.0, 15.0)):
+        self.f107, self.f107a, self.ap = f107, f107a, ap
+        self.fill = fill
+
+    @classmethod
+    def constant(cls, f107=150.0, f107a=None, ap=15.0):
+        """Table returning the same indices at every time (offline runs, tests)."""
+        f107a = f107 if f107a is None else f107a
+        series = [IndexSeries([_CONSTANT_EPOCH], [v], name) for v, name in
+                  ((f107, "F10.7"), (f107a, "F10.7a"), (ap, "Ap"))]
+        return cls(*series, fill=(f107, f107a, ap))
+
+    def lookup(self, times):
+        """(F10.7, F10.7a, Ap) arrays with the shape of `times`."""
+        return tuple(np.where(np.isnan(v), fill, v) for v, fill in
+                     zip((s.lookup(times) for s in (self.f107, self.f107a, self.ap)), self.fill))
+
+
+def load_sw_daily(cache_dir=DEFAULT_CACHE_DIR, max_age=DEFAULT_MAX_AGE):
+    """
+    Daily observed F10.7, its 81-day centred mean and daily Ap (CelesTrak,
+    via the spaceweather package), cached like load_kp_3h.
+
+    Returns:
+        SpaceWeatherTable
+    """
+    def fetch():
+        import spaceweather as sw
+
+        df = sw.sw_daily()
+        times = df.index.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        return {"times": times, "F10.7": df["f107_obs"].to_numpy(dtype=float),
+                "F10.7a": df["f107_81ctr_obs"].to_numpy(dtype=float),
+                "Ap": df["Apavg"].to_numpy(dtype=float)}
+
+    with _cached(os.path.join(cache_dir, "sw_daily.npz"), max_age, fetch) as data:
+        times = data["times"].astype("datetime64[ns]")
+        valid = {key: np.isfinite(data[key]) for key in ("F10.7", "F10.7a", "Ap")}
+        return SpaceWeatherTable(*(IndexSeries(times[valid[key]], data[key][valid[key]], key)
+                                   for key in ("F10.7", "F10.7a", "Ap")))
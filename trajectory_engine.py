@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Process-pool trajectory engine for GTF calculations.
+
+Splits the rows of a trajectory DataFrame (columns Lat, Lon, Alt and an
+optional Time column) into chunks, evaluates each chunk with
+GTF.compute_cutoff_rigidity_batch on a pool of worker processes and streams
+partial results back to the Tk main loop through `root.after` polling, so
+the window never blocks.
+
+Workers only return (Rc, geomag_lat) per point; the T(R) curves are rebuilt
+from Rc on the GUI side, which keeps inter-process traffic small.
+
+All engines share one process pool (`shared_executor`) that lives until
+`shutdown_executor()` is called, normally when the application closes.
+Spawned workers re-import the launching script (GUI.py with tkinter,
+matplotlib, ...), so that start-up cost is paid once per worker for the
+application's lifetime instead of on every run.
+
+Example
+-------
+    engine = TrajectoryEngine(root, traj, epoch,
+                              on_progress=lambda done, total: ...,
+                              on_done=lambda result: ...)
+    engine.start()
+    ...
+    engine.cancel()
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from GTF import compute_cutoff_rigidity_batch
+from igrf_cache import as_datetime64
+
+
+_EXECUTOR = None
+_EXECUTOR_WORKERS = None
+
+
+def shared_executor(max_workers=None):
+    """The process pool shared by all engines, created on first use."""
+    global _EXECUTOR, _EXECUTOR_WORKERS
+    max_workers = max_workers or os.cpu_count() or 1
+    if _EXECUTOR is None or _EXECUTOR_WORKERS != max_workers:
+        shutdown_executor()
+        # "spawn" keeps the Tk interpreter state out of the workers.
+        context = multiprocessing.get_context("spawn")
+        _EXECUTOR = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+        _EXECUTOR_WORKERS = max_workers
+    return _EXECUTOR
+
+
+def shutdown_executor():
+    """Stop the shared pool (call when the application exits)."""
+    global _EXECUTOR, _EXECUTOR_WORKERS
+    if _EXECUTOR is not None:
+        _EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    _EXECUTOR = _EXECUTOR_WORKERS = None
+
+
+def _compute_chunk(start, lat, lon, alt, dates):
+    """Worker entry point: Rc and geomagnetic latitude for one chunk of rows."""
+    Rc, lam_m = compute_cutoff_rigidity_batch(lat, lon, alt, dates)
+    return start, Rc, lam_m
+
+
+class TrajectoryEngine:
+    """
+    Run GTF over a trajectory on a process pool, driven from a Tk root.
+
+    Parameters:
+        root: Tk root (or any widget with `after`) used to poll for results
+        traj (DataFrame): trajectory with Lat [deg], Lon [deg], Alt [km]
+            columns and optionally a Time column
+        dates: datetime used for every row when traj has no Time column
+        on_chunk (callable, optional): on_chunk(start, Rc, geomag_lat) for
+            every finished chunk, rows start:start+len(Rc)
+        on_progress (callable, optional): on_progress(done_rows, total_rows)
+        on_done (callable, optional): on_done({"Rc": ..., "geomag_lat": ...})
+            once every row is computed (not called after cancel())
+        on_error (callable, optional): on_error(exception) if a worker fails;
+            the run is cancelled. Without it the exception propagates.
+        max_workers (int, optional): size of the shared pool, defaults to
+            os.cpu_count()
+        chunk_size (int, optional): rows per task; by default the rows are
+            split into about four tasks per worker
+        poll_ms (int): polling interval of the Tk main loop
+    """
+
+    def __init__(self, root, traj, dates=None, on_chunk=None, on_progress=None,
+                 on_done=None, on_error=None, max_workers=None, chunk_size=None,
+                 poll_ms=100):
+        self.root = root
+        self.lat = traj["Lat"].to_numpy(dtype=float)
+        self.lon = traj["Lon"].to_numpy(dtype=float)
+        self.alt = traj["Alt"].to_numpy(dtype=float)
+        if "Time" in traj:
+            self.dates = traj["Time"].to_numpy(dtype="datetime64[ns]")
+        else:
+            self.dates = np.broadcast_to(as_datetime64(dates), self.lat.shape)
+
+        self.on_chunk = on_chunk
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size or max(1, -(-len(self.lat) // (4 * self.max_workers)))
+        self.poll_ms = poll_ms
+
+        self.Rc = np.full(len(self.lat), np.nan)
+        self.geomag_lat = np.full(len(self.lat), np.nan)
+        self.done_rows = 0
+        self.cancelled = False
+        self._pending = set()
+
+    @property
+    def total_rows(self):
+        return len(self.lat)
+
+    @property
+    def running(self):
+        return bool(self._pending)
+
+    def start(self):
+        executor = shared_executor(self.max_workers)
+        for start in range(0, self.total_rows, self.chunk_size):
+            stop = start + self.chunk_size
+            self._pending.add(executor.submit(
+                _compute_chunk, start, self.lat[start:stop], self.lon[start:stop],
+                self.alt[start:stop], self.dates[start:stop]))
+        self.root.after(self.poll_ms, self._poll)
+
+    def cancel(self):
+        """Stop scheduling work; chunks already running are discarded."""
+        self.cancelled = True
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+
+    def _poll(self):
+        if self.cancelled:
+            return
+
+        finished = [f for f in self._pending if f.done()]
+        for future in finished:
+            self._pending.discard(future)
+            try:
+                start, Rc, lam_m = future.result()
+            except Exception as e:
+                self.cancel()
+                if isinstance(e, BrokenProcessPool):
+                    shutdown_executor()  # a fresh pool is created on the next run
+                if self.on_error is None:
+                    raise
+                self.on_error(e)
+                return
+            stop = start + len(Rc)
+            self.Rc[start:stop] = Rc
+            self.geomag_lat[start:stop] = lam_m
+            self.done_rows += len(Rc)
+            if self.on_chunk is not None:
+                self.on_chunk(start, Rc, lam_m)
+
+        if finished and self.on_progress is not None:
+            self.on_progress(self.done_rows, self.total_rows)
+
+        if self._pending:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            if self.on_done is not None:
+                self.on_done({"Rc": self.Rc, "geomag_lat": self.geomag_lat})
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chunked streaming GTF pipeline for trajectory files of any size.
+
+Reads a trajectory (CSV or Parquet with Lat, Lon, Alt and an optional Time
+column) a chunk at a time, runs GTF.compute_cutoff_rigidity_batch on each
+chunk and appends the results to a Parquet file, so memory use is bounded
+by the chunk size rather than the file size.
+
+The output holds one row per input row with the input columns plus Rc [GV]
+and geomag_lat [deg]. T(R) is not written out: it is fully determined by
+Rc (see GTF.geomagnetic_transmission) and would add 200 columns per row.
+
+Requires pyarrow for Parquet output (pip install pyarrow).
+
+Example
+-------
+    stream_gtf("ephemeris.csv", "ephemeris_gtf.parquet",
+               chunksize=500_000, date=datetime(2025, 1, 1))
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+from GTF import compute_cutoff_rigidity_batch
+
+DEFAULT_CHUNKSIZE = 250_000
+
+
+def iter_trajectory_chunks(path, chunksize=DEFAULT_CHUNKSIZE, time_column="Time"):
+    """
+    Yield the trajectory in DataFrame chunks of at most `chunksize` rows.
+
+    CSV headers are stripped of surrounding whitespace (e.g. "Lat, Lon, Alt")
+    and the time column, if present, is parsed to datetime64.
+    """
+    if os.path.splitext(path)[1].lower() in (".parquet", ".pq"):
+        import pyarrow.parquet as pq
+
+        chunks = (batch.to_pandas() for batch in
+                  pq.ParquetFile(path).iter_batches(batch_size=chunksize))
+    else:
+        chunks = pd.read_csv(path, chunksize=chunksize, skipinitialspace=True)
+
+    for chunk in chunks:
+        chunk.columns = chunk.columns.str.strip()
+        # Fix dtypes so every chunk maps to the same Parquet schema.
+        chunk = chunk.astype({"Lat": float, "Lon": float, "Alt": float})
+        if time_column in chunk:
+            chunk[time_column] = pd.to_datetime(chunk[time_column])
+        yield chunk
+
+
+def compute_chunk(chunk, date=None, time_column="Time"):
+    """GTF columns (Rc, geomag_lat) appended to one trajectory chunk."""
+    dates = chunk[time_column].to_numpy() if time_column in chunk else date
+    if dates is None:
+        raise ValueError(f"Trajectory has no '{time_column}' column; pass a date.")
+    Rc, lam_m = compute_cutoff_rigidity_batch(chunk["Lat"].to_numpy(dtype=float),
+                                              chunk["Lon"].to_numpy(dtype=float),
+                                              chunk["Alt"].to_numpy(dtype=float),
+                                              dates)
+    out = chunk.copy()
+    out["Rc"] = Rc.astype(np.float32)
+    out["geomag_lat"] = lam_m.astype(np.float32)
+    return out
+
+
+def stream_gtf(in_path, out_path, chunksize=DEFAULT_CHUNKSIZE, date=None,
+               time_column="Time", progress=None):
+    """
+    Stream a trajectory file through the GTF calculation into a Parquet file.
+
+    Parameters:
+        in_path (str): trajectory CSV or Parquet file
+        out_path (str): Parquet file to write (overwritten)
+        chunksize (int): rows held in memory at a time
+        date (datetime, optional): epoch for every row if there is no time column
+        time_column (str): name of the per-row time column
+        progress (callable, optional): progress(rows_done) after each chunk
+
+    Returns:
+        int: number of rows written
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    rows = 0
+    try:
+        for chunk in iter_trajectory_chunks(in_path, chunksize, time_column):
+            table = pa.Table.from_pandas(compute_chunk(chunk, date, time_column),
+                                         preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(out_path, table.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+            if progress is not None:
+                progress(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+if __name__ == "__main__":
+    from datetime import datetime
+
+    n = stream_gtf(os.path.join("Data", "example_trajectory.csv"),
+                   os.path.join("Data", "example_trajectory_gtf.parquet"),
+                   date=datetime(2025, 1, 1), progress=lambda r: print(f"{r} rows"))
+    print(f"Wrote {n} rows")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Orbit-averaged and time-integrated geomagnetic transmission.
+
+TransmissionAccumulator integrates GTF.geomagnetic_transmission along a
+trajectory in a single pass: each chunk of cutoff rigidities is folded
+into running sums, so the per-point T(R) curves are never stored.
+
+Outputs
+-------
+- time-averaged transmission spectrum <T(R)> on a rigidity grid
+- fraction of time spent with Rc below each threshold [GV]
+- total integrated time and Rc min / mean / max
+
+Time weighting
+--------------
+If timestamps are given, each sample is weighted by the time elapsed
+since the previous sample (carried across chunks; the very first sample
+gets zero weight). Explicit per-sample durations `dt` [s] may be passed
+instead; without either, every sample has unit weight.
+
+Accumulators over consecutive stretches can be merged in time order; with
+timestamps, the gap between the end of one stretch and the first sample of
+the next is credited to that first sample, exactly as a single pass would.
+
+Example
+-------
+    acc = TransmissionAccumulator(thresholds=[1, 3, 5])
+    for chunk in iter_trajectory_chunks("ephemeris.csv"):
+        gtf = compute_chunk(chunk)
+        acc.add(gtf["Rc"].to_numpy(), times=gtf["Time"].to_numpy())
+    summary = acc.result()
+"""
+
+import numpy as np
+
+from GTF import default_rigidities, geomagnetic_transmission
+
+DEFAULT_THRESHOLDS = (1.0, 3.0, 5.0, 8.0, 10.0)  # GV
+
+
+class TransmissionAccumulator:
+    """
+    Running time integral of T(R) and of Rc threshold occupancy.
+
+    Parameters:
+        R_vals (array, optional): rigidity grid [GV], default 0–20 GV
+        thresholds (sequence): Rc thresholds [GV] for the time-below fractions
+        k (float): transition steepness used in geomagnetic_transmission
+        chunk_size (int): samples expanded to (chunk × R) at a time
+    """
+
+    def __init__(self, R_vals=None, thresholds=DEFAULT_THRESHOLDS, k=1.0, chunk_size=10000):
+        self.R_vals = default_rigidities() if R_vals is None else np.asarray(R_vals, dtype=float)
+        self.thresholds = np.asarray(thresholds, dtype=float)
+        self.k = k
+        self.chunk_size = chunk_size
+
+        self.total_time = 0.0
+        self.samples = 0
+        self._T_sum = np.zeros(self.R_vals.size)
+        self._below = np.zeros(self.thresholds.size)
+        self._Rc_sum = 0.0
+        self.Rc_min = np.inf
+        self.Rc_max = -np.inf
+        self._first_time = None
+        self._first_Rc = np.nan
+        self._last_time = None
+
+    def _weights(self, n, dt, times):
+        if dt is not None:
+            return np.broadcast_to(np.asarray(dt, dtype=float), (n,))
+        if times is not None:
+            t = np.asarray(times, dtype="datetime64[ns]")
+            if self._first_time is None:
+                self._first_time = t[0]
+            previous = t[0] if self._last_time is None else self._last_time
+            self._last_time = t[-1]
+            edges = np.concatenate(([previous], t))
+            return np.diff(edges).astype(np.int64) * 1e-9
+        return np.ones(n)
+
+    def add(self, Rc, dt=None, times=None):
+        """Fold a chunk of cutoff rigidities [GV] (in time order) into the sums."""
+        Rc = np.ravel(np.asarray(Rc, dtype=float))
+        if Rc.size == 0:
+            return self
+        first_chunk = self._first_time is None
+        w = self._weights(Rc.size, dt, times)
+        if first_chunk and self._first_time is not None:
+            self._first_Rc = Rc[0]  # zero-weight sample; merge() credits its gap
+        self._fold(Rc, w)
+        return self
+
+    def _fold(self, Rc, w, count=True):
+        """Add weighted samples to the running sums (NaN Rc gets no weight)."""
+        valid = np.isfinite(Rc)
+        w = np.where(valid, w, 0.0)
+        Rc = np.where(valid, Rc, 0.0)
+
+        for start in range(0, Rc.size, self.chunk_size):
+            Rc_c = Rc[start:start + self.chunk_size]
+            w_c = w[start:start + self.chunk_size]
+            T = geomagnetic_transmission(self.R_vals[np.newaxis, :], Rc_c[:, np.newaxis], self.k)
+            self._T_sum += w_c @ T
+            self._below += w_c @ (Rc_c[:, np.newaxis] < self.thresholds[np.newaxis, :])
+
+        self.total_time += w.sum()
+        if count:
+            self.samples += int(valid.sum())
+        self._Rc_sum += float(w @ Rc)
+        if valid.any():
+            self.Rc_min = min(self.Rc_min, float(Rc[valid].min()))
+            self.Rc_max = max(self.Rc_max, float(Rc[valid].max()))
+
+    def merge(self, other):
+        """
+        Combine with an accumulator over the following stretch of the
+        trajectory. With timestamps, the time between this stretch's last
+        sample and the other's first sample is added as that sample's weight,
+        and later add() calls continue from the other's last timestamp.
+        """
+        if not (np.array_equal(self.R_vals, other.R_vals)
+                and np.array_equal(self.thresholds, other.thresholds)):
+            raise ValueError("Accumulators use different rigidity grids or thresholds.")
+        if self._last_time is not None and other._first_time is not None:
+            if other._first_time < self._last_time:
+                raise ValueError("Merged stretches must be in time order.")
+            gap = (other._first_time - self._last_time).astype(np.int64) * 1e-9
+            # other counted this sample already, only its weight was missing
+            self._fold(np.array([other._first_Rc]), np.array([gap]), count=False)
+        if self._first_time is None:
+            self._first_time, self._first_Rc = other._first_time, other._first_Rc
+        if other._last_time is not None:
+            self._last_time = other._last_time
+        self.total_time += other.total_time
+        self.samples += other.samples
+        self._T_sum += other._T_sum
+        self._below += other._below
+        self._Rc_sum += other._Rc_sum
+        self.Rc_min = min(self.Rc_min, other.Rc_min)
+        self.Rc_max = max(self.Rc_max, other.Rc_max)
+        return self
+
+    @property
+    def mean_transmission(self):
+        """Time-averaged T(R) on R_vals."""
+        return self._T_sum / self.total_time if self.total_time > 0 else np.full(self.R_vals.size, np.nan)
+
+    @property
+    def fraction_below(self):
+        """{threshold [GV]: fraction of time with Rc below it}."""
+        frac = self._below / self.total_time if self.total_time > 0 else np.full(self.thresholds.size, np.nan)
+        return dict(zip(self.thresholds.tolist(), frac.tolist()))
+
+    def result(self):
+        return {
+            "R": self.R_vals,
+            "T_mean": self.mean_transmission,
+            "fraction_below": self.fraction_below,
+            "total_time": self.total_time,
+            "samples": self.samples,
+            "Rc_mean": self._Rc_sum / self.total_time if self.total_time > 0 else np.nan,
+            "Rc_min": self.Rc_min,
+            "Rc_max": self.Rc_max,
+        }
+
+
+def accumulate_trajectory_file(path, thresholds=DEFAULT_THRESHOLDS, date=None,
+                               chunksize=None, time_column="Time", R_vals=None, k=1.0):
+    """
+    One-pass orbit-averaged transmission for a trajectory file of any size.
+
+    Uses trajectory_stream to read and evaluate the file chunk by chunk.
+    Samples are time weighted when the file has a time column.
+    """
+    from trajectory_stream import DEFAULT_CHUNKSIZE, compute_chunk, iter_trajectory_chunks
+
+    acc = TransmissionAccumulator(R_vals, thresholds, k)
+    for chunk in iter_trajectory_chunks(path, chunksize or DEFAULT_CHUNKSIZE, time_column):
+        gtf = compute_chunk(chunk, date, time_column)
+        times = gtf[time_column].to_numpy() if time_column in gtf else None
+        acc.add(gtf["Rc"].to_numpy(), times=times)
+    return acc.result()